@@ -1,54 +1,236 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
 from ..models import Document, Insight, Task
-from ..utils.text import summarize, extract_topics, simple_sentiment
+from ..utils.text import summarize, analyze_text
+from ..utils.ratelimit import CallGate
+from ..utils.tfidf import corpus_topics
+from ..dedupe import find_duplicates, fingerprint, owned_by
 from ..connectors.newsapi import fetch_news
+from ..connectors.http_client import get_session
+from ..config import TASK_CONCURRENCY, TASK_RATE_LIMIT, URL_MAX_CHARS
 
-def _store_doc(db: Session, user_id: Optional[int], payload: Dict[str, Any]) -> Document:
-    doc = Document(
-        user_id=user_id,
-        source=payload["source"],
-        title=payload.get("title"),
-        url=payload.get("url"),
-        content=payload["content"],
-        meta=payload.get("meta"),
-    )
-    db.add(doc); db.commit(); db.refresh(doc)
-    return doc
-
-def _analyze_doc(db: Session, user_id: Optional[int], doc: Document) -> Insight:
-    summary = summarize(doc.content)
-    topics  = extract_topics(doc.content, k=5)
-    senti   = simple_sentiment(doc.content)
-    ins = Insight(user_id=user_id, document_id=doc.id, summary=summary, topics=topics, sentiment=senti)
-    db.add(ins); db.commit(); db.refresh(ins)
-    return ins
+def _add_all(db: Session, objs: List[Any]) -> List[Optional[Exception]]:
+    """
+    Insert `objs` with one flush; if that fails, retry them one by one in
+    savepoints so a single bad row only costs its own item. Returns the
+    per-object error (or None), in order. Nothing is committed here.
+    """
+    try:
+        with db.begin_nested():
+            db.add_all(objs)
+            db.flush()
+        return [None] * len(objs)
+    except Exception:
+        errors: List[Optional[Exception]] = []
+        for obj in objs:
+            try:
+                with db.begin_nested():
+                    db.add(obj)
+                    db.flush()
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+def _new_docs(user_id: Optional[int], payloads: List[Dict[str, Any]]) -> List[Document]:
+    docs = [
+        Document(
+            user_id=user_id,
+            source=p["source"],
+            title=p.get("title"),
+            url=p.get("url"),
+            content=p["content"],
+            meta=p.get("meta"),
+        )
+        for p in payloads
+    ]
+    for doc in docs:
+        fingerprint(doc)
+    return docs
+
+def _store_docs(db: Session, user_id: Optional[int], docs: List[Document], dupes: List[Optional[Document]]) -> Tuple[List[Union[Document, Exception]], Set[int]]:
+    """
+    Insert the documents `find_duplicates` found no match for; a duplicate
+    resolves to the document it matched instead of a new row.
+    Returns one document or error per input document, plus the ids inserted here.
+    """
+    new = [doc for doc, dup in zip(docs, dupes) if dup is None]
+    errors = dict(zip(map(id, new), _add_all(db, new)))
+
+    # a concurrent ingest may have stored the same url between the lookup and our insert
+    lost = [d.url_hash for d in new if errors[id(d)] is not None and d.url_hash]
+    winners = {
+        d.url_hash: d for d in db.execute(
+            select(Document).where(owned_by(user_id), Document.url_hash.in_(lost))
+        ).scalars()
+    } if lost else {}
+
+    # the API process embeds these for search once they are committed (search.run_index_sync)
+    inserted = [d for d in new if errors[id(d)] is None]
+    stored: List[Union[Document, Exception]] = []
+    for doc, dup in zip(docs, dupes):
+        if dup is None and errors[id(doc)] is not None:
+            dup = winners.get(doc.url_hash)
+            stored.append(dup if dup is not None else errors[id(doc)])
+        else:
+            stored.append(dup if dup is not None else doc)
+    return stored, {d.id for d in inserted}
+
+def _known_insights(db: Session, user_id: Optional[int], docs: List[Document]) -> Dict[int, Insight]:
+    """
+    Insights already paid for, keyed by `id()` of the (stored or unsaved)
+    document: the caller's own insight on a stored document if it has one,
+    otherwise the latest insight on the same URL (any owner's copy of the
+    article). Articles never analyzed are left out. Read-only.
+    """
+    ids = {d.id: d for d in docs if d.id is not None}
+    known: Dict[int, Insight] = {}
+    if ids:
+        for ins in db.execute(
+            select(Insight).where(
+                Insight.document_id.in_(list(ids)),
+                Insight.user_id.is_(None) if user_id is None else Insight.user_id == user_id,
+            ).order_by(Insight.id)
+        ).scalars():
+            known[id(ids[ins.document_id])] = ins
+
+    by_hash: Dict[str, List[Document]] = {}
+    for d in docs:
+        if d.url_hash and id(d) not in known:
+            by_hash.setdefault(d.url_hash, []).append(d)
+    if by_hash:
+        for ins, url_hash in db.execute(
+            select(Insight, Document.url_hash).join(Document, Insight.document_id == Document.id)
+            .where(Document.url_hash.in_(list(by_hash))).order_by(Insight.id)
+        ).all():
+            for d in by_hash[url_hash]:
+                known[id(d)] = ins
+    return known
+
+def _analyze_content(content: str, gate: Optional[CallGate] = None) -> Dict[str, Any]:
+    # pure analysis (LLM call + heuristics); safe to run off the request thread
+    a = analyze_text(content, k=5, max_sentences=6)
+    return {
+        "summary": summarize(content, analysis=a, gate=gate),
+        "topics": a.topics,
+        "sentiment": a.sentiment,
+    }
+
+def _analyze_many(contents: List[str], concurrency: int, rate: float) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Analyze on a bounded thread pool; results (or the raised error) come back
+    in input order. Every LLM call, including per-chunk summaries of long
+    documents, shares one gate: `concurrency` in flight, `rate` per second.
+    """
+    gate = CallGate(concurrency, rate)
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(contents) or 1))) as pool:
+        futures = [pool.submit(_analyze_content, c, gate) for c in contents]
+    out: List[Union[Dict[str, Any], Exception]] = []
+    for f in futures:
+        try:
+            out.append(f.result())
+        except Exception as e:
+            out.append(e)
+    return out
+
+def _ingest(db: Session, user_id: Optional[int], payloads: List[Dict[str, Any]], concurrency: int, rate: float) -> List[Dict[str, Any]]:
+    """
+    Dedupe, analyze, then store; one result per payload, in order.
+
+    Only lookups run before the LLM calls, so no inserted row (or SQLite's
+    writer lock) is held while the analysis runs. Documents and insights are
+    then written in one short flush, for the caller to commit.
+    """
+    docs = _new_docs(user_id, payloads)
+    dupes = find_duplicates(db, docs, user_id)
+    # one entry per distinct article: the stored document it matched, or the first new copy in the batch
+    articles = list({id(a): a for a in (dup if dup is not None else doc for doc, dup in zip(docs, dupes))}.values())
+    # articles analyzed before (for anyone) reuse that insight instead of paying for another LLM call
+    known = _known_insights(db, user_id, articles)
+    todo = [a for a in articles if id(a) not in known]
+    contents = [a.content for a in todo]
+    analyses = _analyze_many(contents, concurrency=concurrency, rate=rate)
+    # corpus-aware topics for the whole batch in one vectorized tf-idf pass
+    for analysis, topics in zip(analyses, corpus_topics(contents, k=5)):
+        if not isinstance(analysis, Exception) and topics:
+            analysis["topics"] = topics
+    fresh_analysis = dict(zip(map(id, todo), analyses))
+
+    stored, fresh = _store_docs(db, user_id, docs, dupes)
+    article_of = {id(doc): dup if dup is not None else doc for doc, dup in zip(docs, dupes)}
+
+    outcome: Dict[int, Union[Insight, Exception]] = {}
+    pending: List[Insight] = []
+    for doc, target in zip(docs, stored):
+        if isinstance(target, Exception) or target.id in outcome:
+            continue
+        article = article_of[id(doc)]
+        source = known.get(id(article))
+        analysis = fresh_analysis.get(id(article))
+        if source is not None and source.document_id == target.id and source.user_id == user_id:
+            outcome[target.id] = source
+        elif source is not None:
+            # copy onto the caller's own document; nothing ever points at a document the caller doesn't own
+            ins = Insight(user_id=user_id, document_id=target.id, summary=source.summary,
+                          topics=source.topics, sentiment=source.sentiment)
+            outcome[target.id] = ins; pending.append(ins)
+        elif isinstance(analysis, Exception):
+            outcome[target.id] = analysis
+        else:
+            ins = Insight(user_id=user_id, document_id=target.id, **analysis)
+            outcome[target.id] = ins; pending.append(ins)
+    for ins, err in zip(pending, _add_all(db, pending)):
+        if err is not None:
+            outcome[ins.document_id] = err
+
+    results: List[Dict[str, Any]] = []
+    seen: Set[int] = set()
+    for doc in stored:
+        if isinstance(doc, Exception):
+            results.append({"error": str(doc)})
+            continue
+        result: Dict[str, Any] = {"document_id": doc.id}
+        if doc.id not in fresh or doc.id in seen:
+            result["duplicate"] = True
+        seen.add(doc.id)
+        ins = outcome[doc.id]
+        if isinstance(ins, Exception):
+            result["error"] = str(ins)
+        else:
+            result["insight_id"] = ins.id
+        results.append(result)
+    return results
+
+def execute_task(db: Session, task: Task, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run the task's work and return its items. Raises on failure; does not commit."""
+    opts = task.input or {}
+    concurrency = int(opts.get("concurrency") or TASK_CONCURRENCY)
+    rate = float(opts.get("rate_limit") or TASK_RATE_LIMIT)
+    if task.kind == "news":
+        query = opts.get("query", "technology")
+        articles = fetch_news(query=query)  # can be empty without key
+        for a in articles:
+            a["source"] = "news"
+        return _ingest(db, user_id, articles, concurrency, rate)
+    elif task.kind == "url":
+        import bs4
+        url = opts.get("url")
+        html = get_session().get(url, timeout=20).text
+        soup = bs4.BeautifulSoup(html, "html.parser")
+        text = " ".join([t.get_text(" ", strip=True) for t in soup.select("p")])[:URL_MAX_CHARS]
+        payload = {"source":"url","title":soup.title.string if soup.title else url,"url":url,"content":text}
+        return _ingest(db, user_id, [payload], concurrency, rate)
+    raise ValueError(f"Unknown task kind: {task.kind}")
 
 def run_task(db: Session, task: Task, user_id: Optional[int] = None) -> Task:
     task.status = "running"; db.commit()
     try:
-        results: List[Dict[str, Any]] = []
-        if task.kind == "news":
-            query = (task.input or {}).get("query", "technology")
-            articles = fetch_news(query=query)  # can be empty without key
-            for a in articles:
-                a["source"] = "news"
-                doc = _store_doc(db, user_id, a)
-                ins = _analyze_doc(db, user_id, doc)
-                results.append({"document_id": doc.id, "insight_id": ins.id})
-        elif task.kind == "url":
-            import requests, bs4
-            url = (task.input or {}).get("url")
-            html = requests.get(url, timeout=20).text
-            soup = bs4.BeautifulSoup(html, "html.parser")
-            text = " ".join([t.get_text(" ", strip=True) for t in soup.select("p")])[:20000]
-            doc = _store_doc(db, user_id, {"source":"url","title":soup.title.string if soup.title else url,"url":url,"content":text})
-            ins = _analyze_doc(db, user_id, doc)
-            results.append({"document_id": doc.id, "insight_id": ins.id})
-        else:
-            raise ValueError(f"Unknown task kind: {task.kind}")
-
+        results = execute_task(db, task, user_id)
+        # documents, insights and the final status land in a single commit
         task.status = "done"; task.result = {"items": results}; db.commit()
     except Exception as e:
+        db.rollback()
         task.status = "error"; task.result = {"error": str(e)}; db.commit()
     return task
@@ -1,19 +1,45 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
 from .db import get_db
 from .models import User
 from .schemas import RegisterIn, LoginIn, UserOut, TokenOut
-from .security import hash_password, verify_password, create_access_token
+from .security import hash_password_async, verify_password_async, create_access_token
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# bcrypt runs on its own bounded pool (see security._offload), so these
+# handlers are async; only the short queries borrow the shared threadpool,
+# through the same sync Session every other route uses. No DB connection is
+# held while a hash is queued or running.
+
+
+def _by_email(db: Session, email: str) -> Optional[User]:
+    user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+    if user is not None:
+        db.expunge(user)  # stays loaded after the rollback below
+    db.rollback()  # hand the connection back to the pool before bcrypt
+    return user
+
+
+def _set_hash(db: Session, user_id: int, password_hash: str) -> None:
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
+def _save(db: Session, user: User) -> None:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
 
 @router.post("/register", response_model=UserOut)
-def register(payload: RegisterIn, db: Session = Depends(get_db)):
+async def register(payload: RegisterIn, db: Session = Depends(get_db)):
     # check existing
-    exists = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
+    exists = await run_in_threadpool(_by_email, db, payload.email)
     if exists:
         raise HTTPException(status_code=400, detail="Email already registered")
     
@@ -21,27 +47,31 @@ def register(payload: RegisterIn, db: Session = Depends(get_db)):
     user = User(
         name=payload.name, 
         email=payload.email, 
-        password_hash=hash_password(payload.password)
+        password_hash=await hash_password_async(payload.password)
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(_save, db, user)
     return user
 
 
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
+async def login(payload: LoginIn, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_by_email, db, payload.email)
     
-    if not user or not verify_password(payload.password, user.password_hash):
+    ok, new_hash = await verify_password_async(payload.password, user.password_hash) if user else (False, None)
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid credentials"
         )
+
+    if new_hash:
+        # stored hash predates the current BCRYPT_ROUNDS; upgrade it while we have the password
+        await run_in_threadpool(_set_hash, db, user.id, new_hash)
+        user.password_hash = new_hash
     
     token = create_access_token(
         sub=str(user.id), 
         extra={"email": user.email, "role": user.role}
     )
 
-    return {"access_token": token, "token_type": "bearer", "user": user}
\ No newline at end of file
+    return {"access_token": token, "token_type": "bearer", "user": user}
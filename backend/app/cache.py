@@ -0,0 +1,243 @@
+import asyncio, json, logging, time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .config import (
+    REDIS_URL, CACHE_MAX_ENTRIES, CACHE_STALE_TTL, CACHE_FALLBACK_TTL,
+    NEWS_CACHE_TTL, STOCK_CACHE_TTL, TREND_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Entry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class MemoryTier:
+    """Per-process LRU with TTL; evicts the least recently used key past `max_entries`."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Entry]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Entry]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if time.time() > entry.stale_until:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: Entry) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class SharedTier:
+    """
+    Cross-worker tier on top of any client exposing async get/set/delete
+    (redis.asyncio.Redis, or a small in-memory fake in tests).
+    """
+
+    def __init__(self, client: Any, prefix: str = "akw:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Entry]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            log.warning(f"shared cache get failed: {e}")
+            return None
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return Entry(data["v"], data["f"], data["s"])
+
+    async def set(self, key: str, entry: Entry) -> None:
+        ttl = max(1, int(entry.stale_until - time.time()))
+        raw = json.dumps({"v": entry.value, "f": entry.fresh_until, "s": entry.stale_until})
+        try:
+            await self.client.set(self.prefix + key, raw, ex=ttl)
+        except Exception as e:
+            log.warning(f"shared cache set failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as e:
+            log.warning(f"shared cache delete failed: {e}")
+
+
+_SHARED: Optional[SharedTier] = None
+
+
+def get_shared_tier() -> Optional[SharedTier]:
+    """Redis tier if REDIS_URL is set and redis is installed, else None (memory only)."""
+    global _SHARED
+    if _SHARED is None and REDIS_URL:
+        try:
+            import redis.asyncio as redis  # type: ignore
+            _SHARED = SharedTier(redis.from_url(REDIS_URL))
+        except ImportError:
+            log.warning("REDIS_URL is set but the redis package is not installed")
+    return _SHARED
+
+
+class Cache:
+    """
+    Two-tier async cache with single-flight loading and stale-while-revalidate.
+
+    Entries are fresh for `ttl` seconds, then served stale for another
+    `stale_ttl` seconds while one background task reloads them. Concurrent
+    misses on the same key share a single loader call. With `fallback_ttl`,
+    the last successfully loaded value is kept that long and returned when
+    the loader fails; with `track_hot`, request counts per key are kept so
+    `refresh_hot` can reload popular keys before they expire.
+    """
+
+    def __init__(self, namespace: str, ttl: float, stale_ttl: float = 0,
+                 max_entries: int = CACHE_MAX_ENTRIES, shared: Optional[SharedTier] = None,
+                 fallback_ttl: float = 0, track_hot: bool = False):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.fallback_ttl = fallback_ttl
+        self.track_hot = track_hot
+        self.memory = MemoryTier(max_entries)
+        self._last_good = MemoryTier(max_entries)
+        self._shared = shared
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bg: set = set()
+        self._hits: Counter = Counter()
+        self._loaders: Dict[str, Tuple[Callable[[], Awaitable[Any]], Optional[float]]] = {}
+
+    @property
+    def shared(self) -> Optional[SharedTier]:
+        return self._shared if self._shared is not None else get_shared_tier()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_entry(self, key: str) -> Optional[Entry]:
+        k = self._key(key)
+        entry = self.memory.get(k)
+        if entry is None and self.shared is not None:
+            entry = await self.shared.get(k)
+            if entry is not None:
+                self.memory.set(k, entry)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        entry = Entry(value, now + ttl, now + ttl + self.stale_ttl)
+        k = self._key(key)
+        self.memory.set(k, entry)
+        if self.shared is not None:
+            await self.shared.set(k, entry)
+
+    async def delete(self, key: str) -> None:
+        k = self._key(key)
+        self.memory.delete(k)
+        if self.shared is not None:
+            await self.shared.delete(k)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None) -> Any:
+        if self.track_hot:
+            self._hits[key] += 1
+            self._loaders[key] = (loader, ttl)
+        entry = await self.get_entry(key)
+        now = time.time()
+        if entry is not None:
+            if now < entry.fresh_until:
+                return entry.value
+            if now < entry.stale_until:
+                self.refresh(key, loader, ttl)
+                return entry.value
+        return await self._load(key, loader, ttl)
+
+    def refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> None:
+        """Reload `key` in the background (no-op if a load is already running)."""
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._load(key, loader, ttl))
+        self._bg.add(task)
+        task.add_done_callback(self._bg_done)
+
+    def _bg_done(self, task: asyncio.Future) -> None:
+        self._bg.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(f"{self.namespace} cache refresh failed: {task.exception()}")
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._run_loader(key, loader, ttl))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: a cancelled caller must not cancel the load other callers wait on
+        return await asyncio.shield(fut)
+
+    async def _run_loader(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        try:
+            value = await loader()
+        except Exception:
+            fallback = self._last_good.get(self._key(key))
+            if fallback is None:
+                raise
+            log.warning(f"{self.namespace} loader failed, serving last known good for {key}")
+            return fallback.value
+        await self.set(key, value, ttl)
+        if self.fallback_ttl:
+            now = time.time()
+            self._last_good.set(self._key(key), Entry(value, now, now + self.fallback_ttl))
+        return value
+
+    async def refresh_hot(self, top_n: int, lead: float) -> int:
+        """
+        Reload the `top_n` most requested keys whose entry expires within
+        `lead` seconds (or is already gone). Counts are halved on each sweep
+        so popularity follows recent traffic, and cold keys are forgotten.
+        """
+        now = time.time()
+        refreshed = 0
+        for key, _ in self._hits.most_common(top_n):
+            loader, ttl = self._loaders[key]
+            entry = await self.get_entry(key)
+            if entry is None or entry.fresh_until - now <= lead:
+                self.refresh(key, loader, ttl)
+                refreshed += 1
+
+        self._hits = Counter({k: n // 2 for k, n in self._hits.most_common(top_n * 4) if n // 2})
+        self._loaders = {k: self._loaders[k] for k in self._hits}
+        return refreshed
+
+
+async def run_refresher(cache: Cache, interval: float, top_n: int) -> None:
+    """Keep `cache`'s hot keys warm; run as a task from the app lifespan."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await cache.refresh_hot(top_n, lead=interval * 1.5)
+        except Exception as e:
+            log.warning(f"{cache.namespace} refresher sweep failed: {e}")
+
+
+# shared namespaces for upstream responses
+news_cache = Cache("news", ttl=NEWS_CACHE_TTL, stale_ttl=CACHE_STALE_TTL, fallback_ttl=CACHE_FALLBACK_TTL)
+stock_cache = Cache("stock", ttl=STOCK_CACHE_TTL, stale_ttl=CACHE_STALE_TTL, fallback_ttl=CACHE_FALLBACK_TTL)
+trend_cache = Cache("trends", ttl=TREND_CACHE_TTL, stale_ttl=CACHE_STALE_TTL,
+                    fallback_ttl=CACHE_FALLBACK_TTL, track_hot=True)
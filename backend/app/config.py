@@ -8,3 +8,112 @@ load_dotenv()
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "")
+
+# Uploads
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))      # reject bigger uploads (413)
+PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", "50000"))                # CSV rows per profiling chunk
+
+# PDF extraction
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))                            # pages extracted per document
+PDF_TIME_BUDGET = float(os.getenv("PDF_TIME_BUDGET", "30"))                       # seconds per document
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Outbound HTTP (shared connection pools)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Response cache (in-process LRU, optionally backed by Redis)
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "120"))
+STOCK_CACHE_TTL = int(os.getenv("STOCK_CACHE_TTL", "60"))
+TREND_CACHE_TTL = int(os.getenv("TREND_CACHE_TTL", "300"))
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "900"))                         # serve stale while refreshing
+CACHE_FALLBACK_TTL = int(os.getenv("CACHE_FALLBACK_TTL", "86400"))                 # last-known-good kept for upstream outages
+TREND_REFRESH_INTERVAL = int(os.getenv("TREND_REFRESH_INTERVAL", "60"))            # seconds between hot-key sweeps
+TREND_REFRESH_TOP = int(os.getenv("TREND_REFRESH_TOP", "20"))                      # hot trend keys kept warm
+
+# Trend rollups
+TRENDS_FETCH_CONCURRENCY = int(os.getenv("TRENDS_FETCH_CONCURRENCY", "4"))         # per-day NewsAPI counts in flight
+TRENDS_SETTLE_HOURS = float(os.getenv("TRENDS_SETTLE_HOURS", "2"))                 # a day's count is final this long after it ends
+
+# Orchestrator
+TASK_CONCURRENCY = int(os.getenv("TASK_CONCURRENCY", "4"))                         # parallel analyses per task
+TASK_RATE_LIMIT = float(os.getenv("TASK_RATE_LIMIT", "0"))                         # analyses started per second, 0 = unlimited
+TASK_MAX_CONCURRENCY = int(os.getenv("TASK_MAX_CONCURRENCY", "16"))                # upper bound a task request may ask for
+TASK_MAX_RATE_LIMIT = float(os.getenv("TASK_MAX_RATE_LIMIT", "20"))                # upper bound on a requested rate_limit
+
+# Task queue (python -m app.jobs)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))                                   # worker processes
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))                     # seconds between empty polls
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "120"))                     # reclaimed if no heartbeat for this long
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "10"))                      # seconds, doubled per attempt
+
+# Derived document state catching up on committed rows
+WATERMARK_GAP_WINDOW = int(os.getenv("WATERMARK_GAP_WINDOW", "1000"))              # missing ids this close to the newest are re-checked
+WATERMARK_GAP_TTL = int(os.getenv("WATERMARK_GAP_TTL", "3600"))                    # seconds before a missing id counts as rolled back
+
+# Corpus TF-IDF topics
+TFIDF_STATE_PATH = os.getenv("TFIDF_STATE_PATH", "tfidf_state.npz")                # snapshot of document frequencies; empty = rebuild per process
+
+# Semantic search
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")                                 # sentence-transformers model; empty = hashing fallback
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))                             # hashing vectorizer width
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "search.faiss")
+SEARCH_SAVE_INTERVAL = int(os.getenv("SEARCH_SAVE_INTERVAL", "60"))                # min seconds between index snapshots
+SEARCH_SYNC_INTERVAL = int(os.getenv("SEARCH_SYNC_INTERVAL", "30"))                # seconds between background catch-ups (API only)
+SEARCH_QUERY_SYNC = int(os.getenv("SEARCH_QUERY_SYNC", "64"))                      # max new documents a search request embeds itself
+
+# Long-document summarization (map-reduce)
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))              # tokens per map chunk
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))                   # parallel chunk summaries per document
+SUMMARY_FAN_IN = int(os.getenv("SUMMARY_FAN_IN", "8"))                             # partial summaries merged per reduce call
+URL_MAX_CHARS = int(os.getenv("URL_MAX_CHARS", "500000"))                          # page text kept by url tasks
+
+# LLM response cache
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")                  # disk tier; empty = memory only
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "100000"))                # disk tier size cap (LRU)
+
+# Gemini client
+GEMINI_RATE = float(os.getenv("GEMINI_RATE", "1"))                                 # requests per second (token bucket refill)
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "5"))                                 # token bucket size
+GEMINI_CONCURRENCY = int(os.getenv("GEMINI_CONCURRENCY", "4"))                     # requests in flight per process
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))                     # on 429 / 5xx / transport errors
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "1"))                 # seconds, doubled per retry (jittered)
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "30"))
+GEMINI_BATCH_WINDOW = float(os.getenv("GEMINI_BATCH_WINDOW", "0.05"))              # seconds small prompts wait for company
+GEMINI_BATCH_MAX = int(os.getenv("GEMINI_BATCH_MAX", "8"))                         # prompts per combined request
+GEMINI_BATCH_MAX_CHARS = int(os.getenv("GEMINI_BATCH_MAX_CHARS", "2000"))          # larger prompts are sent on their own
+
+# Ingest deduplication
+SIMHASH_DISTANCE = int(os.getenv("SIMHASH_DISTANCE", "3"))                         # max differing bits for a near-duplicate
+SIMHASH_BAND_BITS = int(os.getenv("SIMHASH_BAND_BITS", "16"))                      # leading bits a candidate must share
+
+# Database engine (Postgres; pool settings are ignored for SQLite)
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() == "true"              # create missing tables at startup instead of via alembic
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))                                # connections kept open per process
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))                          # extra connections under burst
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))                        # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))                        # reconnect after this many seconds
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"        # extra round trip per checkout
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))       # 0 = no server-side limit
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))                 # psycopg server-side prepare after N runs; 0 = off (pgbouncer)
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "500"))                 # SQLAlchemy compiled-statement cache
+
+# Auth hot path
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))                         # verified tokens kept (each until its exp)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))                            # seconds; local changes invalidate at once
+
+# Password hashing
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))                              # cost; older hashes are upgraded on login
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))                             # dedicated hashing threads
+BCRYPT_QUEUE = int(os.getenv("BCRYPT_QUEUE", "0"))                                 # max hashes waiting or running; 0 = what finishes within BCRYPT_TIMEOUT
+BCRYPT_TIMEOUT = float(os.getenv("BCRYPT_TIMEOUT", "5"))                           # seconds a request may wait for its hash
@@ -1,9 +1,39 @@
-import os, requests
+import os
+from typing import Any, Dict
+from .http_client import get_client, get_session
 
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY")
+ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+SERIES_KEY = "Time Series (Daily)"
+
+
+class AlphaVantageError(Exception):
+    """An HTTP 200 without a price series: rate-limit "Note"/"Information" or "Error Message" payloads."""
+
+    def __init__(self, data: Dict[str, Any]):
+        detail = data.get("Note") or data.get("Information") or data.get("Error Message") or "no daily series"
+        super().__init__(f"AlphaVantage: {detail}")
+        self.data = data
+
+
+def _params(symbol: str):
+    return {"function": "TIME_SERIES_DAILY", "symbol": symbol, "apikey": ALPHA_VANTAGE_KEY}
+
+
+def _checked(data: Dict[str, Any]) -> Dict[str, Any]:
+    # raising keeps these out of the stock cache, which then serves the last good series
+    if SERIES_KEY not in data:
+        raise AlphaVantageError(data)
+    return data
+
 
 def fetch_stock(symbol: str):
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={ALPHA_VANTAGE_KEY}"
-    res = requests.get(url)
+    res = get_session().get(ALPHA_VANTAGE_URL, params=_params(symbol), timeout=10)
+    res.raise_for_status()
+    return _checked(res.json())
+
+
+async def fetch_stock_async(symbol: str):
+    res = await get_client().get(ALPHA_VANTAGE_URL, params=_params(symbol), timeout=10)
     res.raise_for_status()
-    return res.json()
+    return _checked(res.json())
@@ -1,26 +1,45 @@
-import os
+import asyncio, json, logging, os, random, re, threading, time
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
 import requests
+from .http_client import get_client, get_session
+from ..llm_cache import llm_cache
+from ..utils.ratelimit import TokenBucket
+from ..config import (
+    GEMINI_RATE, GEMINI_BURST, GEMINI_CONCURRENCY, GEMINI_MAX_RETRIES, GEMINI_BACKOFF_BASE,
+    GEMINI_BACKOFF_MAX, GEMINI_BATCH_WINDOW, GEMINI_BATCH_MAX, GEMINI_BATCH_MAX_CHARS,
+)
+
+log = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+DEFAULT_MODEL = "gemini-1.5-pro-latest"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+_SECTION = re.compile(r"^### (\d+)\s*$", re.MULTILINE)
 
-def gemini_chat(prompt: str, model: str = "gemini-1.5-pro-latest"):
-    if not GEMINI_API_KEY:
-        return {"error": "GEMINI_API_KEY is missing"}
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+class GeminiError(Exception):
+    def __init__(self, status: int, detail: Any):
+        super().__init__(f"Gemini answered {status}: {detail}")
+        self.status = status
+        self.detail = detail
+
 
+def _request(parts: List[str], model: str, method: str = "generateContent"):
+    url = f"{GEMINI_BASE_URL}/{model}:{method}"
     body = {
         "contents": [
-            {"parts": [{"text": prompt}]}
+            {"parts": [{"text": p} for p in parts]}
         ]
     }
+    return url, body
 
-    res = requests.post(url, params={"key": GEMINI_API_KEY}, json=body)
 
-    if res.status_code != 200:
-        return {"error": res.json(), "status": res.status_code}
-
-    data = res.json()
+def _parse(status: int, data: dict):
+    if status != 200:
+        return {"error": data, "status": status}
 
     text = (
         data.get("candidates", [{}])[0]
@@ -30,3 +49,273 @@ def gemini_chat(prompt: str, model: str = "gemini-1.5-pro-latest"):
     )
 
     return {"text": text}
+
+
+def _chunk_text(data: dict) -> str:
+    parts = (data.get("candidates") or [{}])[0].get("content", {}).get("parts") or []
+    return "".join(p.get("text", "") for p in parts)
+
+
+def _json(res) -> Any:
+    try:
+        return res.json()
+    except ValueError:
+        return res.text
+
+
+def _ok(result: dict) -> bool:
+    return "error" not in result
+
+
+def _retry_after(headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, retry_after: Optional[float]) -> float:
+    """Jittered exponential delay for retry `attempt` (0-based), never shorter than Retry-After."""
+    delay = min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+    return max(delay, retry_after or 0.0)
+
+
+def _batch_parts(prompts: List[str]) -> List[str]:
+    head = (
+        f"Answer each of the following {len(prompts)} requests independently. "
+        f"Reply with exactly {len(prompts)} sections, each starting with a line "
+        "'### <number>' matching the request, and nothing before the first section."
+    )
+    return [head] + [f"### {i}\n{p}" for i, p in enumerate(prompts, 1)]
+
+
+def _split_batch(text: str, n: int) -> Optional[List[str]]:
+    pieces = _SECTION.split(text)
+    sections = {int(num): body.strip() for num, body in zip(pieces[1::2], pieces[2::2])}
+    if sorted(sections) != list(range(1, n + 1)):
+        return None
+    return [sections[i] for i in range(1, n + 1)]
+
+
+class GeminiClient:
+    """
+    Shared gate for every Gemini call in the process.
+
+    Requests draw from one token bucket (GEMINI_RATE/s, bursts of
+    GEMINI_BURST), at most GEMINI_CONCURRENCY are in flight, and 429/5xx or
+    transport errors are retried with jittered exponential backoff that
+    honours Retry-After. `summarize` additionally folds small prompts of the
+    same `group` arriving within GEMINI_BATCH_WINDOW into one multi-part
+    request; prompts of different groups never share a model context.
+    """
+
+    def __init__(self):
+        self.bucket = TokenBucket(GEMINI_RATE, GEMINI_BURST)
+        self._thread_sem = threading.BoundedSemaphore(GEMINI_CONCURRENCY)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[Tuple[str, str], List[Tuple[str, asyncio.Future]]] = {}
+
+    def _loop_state(self) -> asyncio.Semaphore:
+        # semaphores and futures belong to one event loop; start over if it changed
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(GEMINI_CONCURRENCY)
+            self._pending = {}
+        return self._sem
+
+    # ---- async ----
+    async def send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        sem = self._loop_state()
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            await self.bucket.acquire_async()
+            try:
+                async with sem:
+                    res = await get_client().request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == GEMINI_MAX_RETRIES:
+                    raise
+                delay = _backoff(attempt, None)
+                log.warning(f"Gemini request failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if res.status_code not in _RETRY_STATUS or attempt == GEMINI_MAX_RETRIES:
+                    return res
+                delay = _backoff(attempt, _retry_after(res.headers))
+                log.warning(f"Gemini answered {res.status_code}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def generate(self, parts: List[str], model: str = DEFAULT_MODEL, timeout: float = 30) -> Dict[str, Any]:
+        url, body = _request(parts, model)
+        res = await self.send("POST", url, params={"key": GEMINI_API_KEY}, json=body, timeout=timeout)
+        return _parse(res.status_code, _json(res))
+
+    async def stream(self, parts: List[str], model: str = DEFAULT_MODEL, timeout: float = 60) -> AsyncIterator[str]:
+        """
+        Yield text fragments from streamGenerateContent (SSE) as they arrive.
+        Only failures before the first fragment are retried; the upstream
+        connection closes as soon as the caller stops iterating.
+        """
+        url, body = _request(parts, model, "streamGenerateContent")
+        sem = self._loop_state()
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            await self.bucket.acquire_async()
+            yielded = False
+            try:
+                async with sem, get_client().stream(
+                    "POST", url, params={"alt": "sse", "key": GEMINI_API_KEY}, json=body, timeout=timeout,
+                ) as res:
+                    if res.status_code != 200:
+                        await res.aread()
+                        if res.status_code not in _RETRY_STATUS or attempt == GEMINI_MAX_RETRIES:
+                            raise GeminiError(res.status_code, _json(res))
+                        delay = _backoff(attempt, _retry_after(res.headers))
+                        log.warning(f"Gemini answered {res.status_code}, retrying in {delay:.1f}s")
+                    else:
+                        async for line in res.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            text = _chunk_text(json.loads(line[5:]))
+                            if text:
+                                yielded = True
+                                yield text
+                        return
+            except httpx.TransportError as e:
+                if yielded or attempt == GEMINI_MAX_RETRIES:
+                    raise
+                delay = _backoff(attempt, None)
+                log.warning(f"Gemini stream failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def summarize(self, prompt: str, model: str = DEFAULT_MODEL, group: str = "") -> Dict[str, Any]:
+        """
+        Like `generate`, but small prompts may share a request with others of
+        the same `group` (one tenant, or content that is public anyway).
+        """
+        if GEMINI_BATCH_MAX <= 1 or len(prompt) > GEMINI_BATCH_MAX_CHARS:
+            return await self.generate([prompt], model)
+        self._loop_state()
+        fut = asyncio.get_running_loop().create_future()
+        key = (model, group)
+        queue = self._pending.setdefault(key, [])
+        queue.append((prompt, fut))
+        if len(queue) == 1:
+            asyncio.get_running_loop().call_later(GEMINI_BATCH_WINDOW, self._flush, key, queue)
+        if len(queue) >= GEMINI_BATCH_MAX:
+            self._flush(key, queue)
+        return await fut
+
+    def _flush(self, key: Tuple[str, str], queue: List[Tuple[str, asyncio.Future]]) -> None:
+        if self._pending.get(key) is not queue:
+            return  # already flushed
+        del self._pending[key]
+        asyncio.ensure_future(self._run_batch(key[0], queue))
+
+    async def _run_batch(self, model: str, queue: List[Tuple[str, asyncio.Future]]) -> None:
+        prompts = [p for p, _ in queue]
+        try:
+            if len(prompts) == 1:
+                results = [await self.generate(prompts, model)]
+            else:
+                combined = await self.generate(_batch_parts(prompts), model)
+                answers = _split_batch(combined["text"], len(prompts)) if _ok(combined) else None
+                if answers is not None:
+                    results = [{"text": a} for a in answers]
+                elif not _ok(combined):
+                    results = [combined] * len(prompts)
+                else:
+                    # model ignored the section format; fall back to one request each
+                    results = await asyncio.gather(*(self.generate([p], model) for p in prompts))
+        except Exception as e:
+            for _, fut in queue:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(queue, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    # ---- sync (worker threads) ----
+    def send_sync(self, method: str, url: str, **kwargs) -> requests.Response:
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            self.bucket.acquire()
+            try:
+                with self._thread_sem:
+                    res = get_session().request(method, url, **kwargs)
+            except requests.RequestException as e:
+                if attempt == GEMINI_MAX_RETRIES:
+                    raise
+                delay = _backoff(attempt, None)
+                log.warning(f"Gemini request failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                if res.status_code not in _RETRY_STATUS or attempt == GEMINI_MAX_RETRIES:
+                    return res
+                delay = _backoff(attempt, _retry_after(res.headers))
+                log.warning(f"Gemini answered {res.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+gemini_client = GeminiClient()
+
+
+def gemini_chat(prompt: str, model: str = DEFAULT_MODEL):
+    if not GEMINI_API_KEY:
+        return {"error": "GEMINI_API_KEY is missing"}
+    url, body = _request([prompt], model)
+
+    def call():
+        res = gemini_client.send_sync("POST", url, params={"key": GEMINI_API_KEY}, json=body, timeout=30)
+        return _parse(res.status_code, _json(res))
+
+    return llm_cache.cached("gemini", model, prompt, None, call, cacheable=_ok)
+
+
+async def gemini_chat_async(prompt: str, model: str = DEFAULT_MODEL, batch_group: Optional[str] = None,
+                            cache_params: Optional[Dict[str, Any]] = None):
+    """
+    Cached Gemini completion. With `batch_group`, small prompts may be
+    micro-batched with others of the same group: pass a per-user key, or a
+    shared one only for prompts carrying no tenant data.
+    """
+    if not GEMINI_API_KEY:
+        return {"error": "GEMINI_API_KEY is missing"}
+
+    async def call():
+        if batch_group is not None:
+            return await gemini_client.summarize(prompt, model, batch_group)
+        return await gemini_client.generate([prompt], model)
+
+    return await llm_cache.acached("gemini", model, prompt, cache_params, call, cacheable=_ok)
+
+
+async def gemini_stream_async(prompt: str, model: str = DEFAULT_MODEL,
+                              cache_params: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Stream a completion as text fragments. A cached answer is replayed in one
+    piece; a stream that runs to the end is cached for the non-streaming path.
+    """
+    if not GEMINI_API_KEY:
+        raise GeminiError(500, "GEMINI_API_KEY is missing")
+    hit = await llm_cache.aget("gemini", model, prompt, cache_params)
+    if hit is not None:
+        yield hit["text"]
+        return
+    pieces: List[str] = []
+    async for text in gemini_client.stream([prompt], model):
+        pieces.append(text)
+        yield text
+    await llm_cache.aset("gemini", model, prompt, cache_params, {"text": "".join(pieces)})
+
+
+async def list_models():
+    res = await gemini_client.send("GET", GEMINI_BASE_URL, params={"key": GEMINI_API_KEY}, timeout=10)
+    return res.status_code, _json(res)
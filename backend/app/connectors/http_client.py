@@ -0,0 +1,82 @@
+import threading
+from typing import Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import (
+    HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_KEEPALIVE_EXPIRY,
+)
+
+# h2 is optional: without it httpx silently stays on HTTP/1.1 keep-alive
+try:
+    import h2  # type: ignore  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# upstreams that get their own capped pool, so one slow host can't take every connection
+UPSTREAM_HOSTS = (
+    "https://newsapi.org",
+    "https://www.alphavantage.co",
+    "https://generativelanguage.googleapis.com",
+)
+
+_CLIENT: Optional[httpx.AsyncClient] = None
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _transport(max_connections: int) -> httpx.AsyncHTTPTransport:
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncHTTPTransport(http2=_HTTP2, limits=limits, retries=1)
+
+
+def get_client() -> httpx.AsyncClient:
+    """App-wide pooled async client. Opened by the FastAPI lifespan, or lazily."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            timeout=_timeout(),
+            transport=_transport(HTTP_MAX_CONNECTIONS),
+            mounts={host: _transport(HTTP_MAX_CONNECTIONS_PER_HOST) for host in UPSTREAM_HOSTS},
+        )
+    return _CLIENT
+
+
+def get_session() -> requests.Session:
+    """Pooled requests.Session for the remaining sync call sites (orchestrator, scripts)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=len(UPSTREAM_HOSTS) + 4,
+                                      pool_maxsize=HTTP_MAX_CONNECTIONS_PER_HOST, max_retries=1)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _SESSION = s
+    return _SESSION
+
+
+async def open_http() -> None:
+    get_client()
+    get_session()
+
+
+async def close_http() -> None:
+    global _CLIENT, _SESSION
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+    if _SESSION is not None:
+        _SESSION.close()
+        _SESSION = None
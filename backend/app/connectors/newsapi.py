@@ -1,14 +1,17 @@
-import os, requests
+import os
+from typing import Any, Dict, List, Tuple
+from .http_client import get_client, get_session
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+NEWS_API_URL = "https://newsapi.org/v2/everything"
 
-def fetch_news(query: str = "technology", page_size: int = 5):
-    if not NEWS_API_KEY:
-        return []
-    url = "https://newsapi.org/v2/everything"
+
+def _params(query: str, page_size: int, **extra) -> Dict[str, Any]:
     params = {"q": query, "pageSize": page_size, "sortBy": "publishedAt", "language": "en", "apiKey": NEWS_API_KEY}
-    r = requests.get(url, params=params, timeout=15)
-    r.raise_for_status()
-    articles = r.json().get("articles", [])
+    params.update(extra)
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def _normalize(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out = []
     for a in articles:
         out.append({
@@ -18,3 +21,26 @@ def fetch_news(query: str = "technology", page_size: int = 5):
             "meta": {"source": a.get("source",{}).get("name"), "publishedAt": a.get("publishedAt")}
         })
     return out
+
+
+def fetch_news(query: str = "technology", page_size: int = 5, **extra):
+    if not NEWS_API_KEY:
+        return []
+    r = get_session().get(NEWS_API_URL, params=_params(query, page_size, **extra), timeout=15)
+    r.raise_for_status()
+    return _normalize(r.json().get("articles", []))
+
+
+async def search_news_async(query: str, page_size: int = 5, **extra) -> Tuple[int, List[Dict[str, Any]]]:
+    """(totalResults, first page of articles); the total is exact even when paging is capped."""
+    if not NEWS_API_KEY:
+        return 0, []
+    r = await get_client().get(NEWS_API_URL, params=_params(query, page_size, **extra), timeout=15)
+    r.raise_for_status()
+    data = r.json()
+    return int(data.get("totalResults") or 0), _normalize(data.get("articles", []))
+
+
+async def fetch_news_async(query: str = "technology", page_size: int = 5, **extra):
+    _, articles = await search_news_async(query, page_size, **extra)
+    return articles
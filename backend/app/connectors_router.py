@@ -1,27 +1,29 @@
-from fastapi import APIRouter, Query, HTTPException
-from .connectors.newsapi import fetch_news
-from .connectors.alphavantage import fetch_stock
-from .connectors.gemini import gemini_chat
+import httpx
+from fastapi import APIRouter, Query, HTTPException, Request
+from .connectors.newsapi import fetch_news_async
+from .connectors.alphavantage import fetch_stock_async
+from .connectors.gemini import GeminiError, gemini_chat_async, gemini_stream_async, list_models as list_gemini_models
 from .schemas import GeminiPrompt  # <-- use the one from schemas.py
 from pydantic import BaseModel
-import os, requests
+from .cache import news_cache, stock_cache
+from .llm_cache import llm_cache
+from .utils.sse import primed, sse_response
 
 router = APIRouter(prefix="/api", tags=["connectors"])
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 @router.get("/news")
-def get_news(query: str = Query("AI")):
+async def get_news(query: str = Query("AI")):
     try:
-        return fetch_news(query)
+        return await news_cache.get_or_load(f"everything:{query}:5", lambda: fetch_news_async(query))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/stock/{symbol}")
-def get_stock(symbol: str):
+async def get_stock(symbol: str):
     try:
-        return fetch_stock(symbol)
+        return await stock_cache.get_or_load(symbol.upper(), lambda: fetch_stock_async(symbol))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -30,17 +32,33 @@ class GeminiPrompt(BaseModel):
     model: str = "gemini-1.5-pro-latest"
     
 @router.post("/gemini")
-def chat_with_gemini(body: GeminiPrompt):
+async def chat_with_gemini(body: GeminiPrompt):
     try:
-        response = gemini_chat(body.prompt, body.model)
+        response = await gemini_chat_async(body.prompt, body.model)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/gemini/stream")
+async def stream_gemini(body: GeminiPrompt, request: Request):
+    try:
+        chunks = await primed(gemini_stream_async(body.prompt, body.model))
+    except GeminiError as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
+    except httpx.TimeoutException as e:
+        raise HTTPException(status_code=504, detail=f"Gemini timed out: {e!r}")
+    except httpx.TransportError as e:
+        # retries are exhausted by now; the upstream is unreachable, not our bug
+        raise HTTPException(status_code=502, detail=f"Gemini unreachable: {e!r}")
+    return sse_response(request, chunks)
+
 @router.get("/gemini/models")
-def list_models():
-    url = "https://generativelanguage.googleapis.com/v1beta/models"
-    res = requests.get(url, params={"key": GEMINI_API_KEY})
-    if res.status_code != 200:
-        raise HTTPException(status_code=res.status_code, detail=res.json())
-    return res.json()
\ No newline at end of file
+async def list_models():
+    status, data = await list_gemini_models()
+    if status != 200:
+        raise HTTPException(status_code=status, detail=data)
+    return data
+
+@router.get("/llm/cache")
+def llm_cache_stats():
+    return llm_cache.snapshot()
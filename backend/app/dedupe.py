@@ -0,0 +1,123 @@
+"""
+Ingest-time duplicate detection for documents.
+
+Two documents of the same owner are the same article when their normalized
+URLs match (`url_hash`, unique per owner), or when their 64-bit SimHash
+fingerprints are within SIMHASH_DISTANCE bits of each other (`simhash`,
+indexed). Only news articles get a `url_hash`: a page fetched by a `url`
+task can change under the same address, so it is matched on content
+alone. Documents never resolve to another owner's row. Fingerprints are
+stored offset into the signed BIGINT range so that all fingerprints sharing
+their top SIMHASH_BAND_BITS bits form one contiguous, index-friendly range.
+"""
+import hashlib, re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import numpy as np
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, load_only
+from .models import Document
+from .config import SIMHASH_DISTANCE, SIMHASH_BAND_BITS
+
+_TOKEN = re.compile(r"\w+")
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid)$", re.IGNORECASE)
+_BITS = np.arange(64, dtype=np.uint64)
+_OFFSET = 1 << 63
+
+
+# ----------------- URLs -----------------
+def normalize_url(url: str) -> str:
+    """Canonical form of `url`: lower-cased host without www/default port, no fragment or tracking params."""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if scheme in ("http", "https") else scheme, host, path, query, ""))
+
+
+def url_hash(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+
+# ----------------- SimHash -----------------
+def simhash(text: str, shingle: int = 3) -> Optional[int]:
+    """64-bit SimHash over word `shingle`-grams, returned in signed (offset) form; None for empty text."""
+    words = _TOKEN.findall(text.lower())
+    grams = Counter(" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1)))
+    grams.pop("", None)
+    if not grams:
+        return None
+    digests = b"".join(hashlib.blake2b(g.encode(), digest_size=8).digest() for g in grams)
+    hashes = np.frombuffer(digests, dtype=np.uint64)
+    weights = np.fromiter(grams.values(), dtype=np.int64, count=len(grams))
+    bits = ((hashes[:, None] >> _BITS) & np.uint64(1)).astype(np.int64)
+    votes = (bits * 2 - 1).T @ weights
+    value = int(np.sum(np.left_shift(np.uint64(1), _BITS[votes > 0]), dtype=np.uint64))
+    return value - _OFFSET
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a + _OFFSET) ^ (b + _OFFSET)).count("1")
+
+
+def _band(value: int):
+    """Inclusive signed range of every fingerprint sharing `value`'s top band."""
+    shift = 64 - SIMHASH_BAND_BITS
+    lo = ((value + _OFFSET) >> shift) << shift
+    return lo - _OFFSET, lo + (1 << shift) - 1 - _OFFSET
+
+
+def fingerprint(doc: Document) -> None:
+    """Fill in `url_hash` (news only) / `simhash` on an unsaved document."""
+    doc.url_hash = url_hash(doc.url) if doc.source == "news" else None
+    doc.simhash = simhash(f"{doc.title or ''} {doc.content}")
+
+
+# ----------------- lookup -----------------
+def owned_by(user_id: Optional[int]):
+    return Document.user_id.is_(None) if user_id is None else Document.user_id == user_id
+
+
+def find_duplicates(db: Session, docs: Sequence[Document], user_id: Optional[int]) -> List[Optional[Document]]:
+    """
+    For each fingerprinted, unsaved document: the stored (or earlier in-batch)
+    document of the same owner (`user_id`, None = unowned) it duplicates,
+    else None. One query by URL hash, one by SimHash band.
+    """
+    slim = load_only(Document.id, Document.user_id, Document.url_hash, Document.simhash)  # content loads on demand
+    owner = owned_by(user_id)
+    hashes = [d.url_hash for d in docs if d.url_hash]
+    by_url: Dict[str, Document] = {
+        d.url_hash: d for d in db.execute(
+            select(Document).options(slim).where(owner, Document.url_hash.in_(hashes))
+        ).scalars()
+    } if hashes else {}
+
+    fps = {d.simhash for d in docs if d.simhash is not None and d.url_hash not in by_url}
+    bands = [and_(Document.simhash >= lo, Document.simhash <= hi) for lo, hi in map(_band, fps)]
+    candidates: List[Document] = list(
+        db.execute(select(Document).options(slim).where(owner, or_(*bands))).scalars()
+    ) if bands else []
+
+    out: List[Optional[Document]] = []
+    for doc in docs:
+        match = by_url.get(doc.url_hash) if doc.url_hash else None
+        if match is None and doc.simhash is not None:
+            match = next((c for c in candidates if c.simhash is not None
+                          and hamming(c.simhash, doc.simhash) <= SIMHASH_DISTANCE), None)
+        out.append(match)
+        if match is None:
+            # later copies in the same batch resolve to this one
+            if doc.url_hash:
+                by_url[doc.url_hash] = doc
+            if doc.simhash is not None:
+                candidates.append(doc)
+    return out
@@ -1,16 +1,36 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-import os
+from sqlalchemy import event, select
+from dataclasses import dataclass
+import hashlib, os, threading, time
+from .cache import Entry, MemoryTier
+from .config import JWT_CACHE_SIZE, USER_CACHE_SIZE, USER_CACHE_TTL
+from .db import SessionLocal
+from .models import User
 
 JWT_SECRET = os.getenv("JWT_SECRET", "changeme")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+# verified tokens by sha256, each kept no longer than its own exp
+_tokens = MemoryTier(JWT_CACHE_SIZE)
+_tokens_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    email: str
+    role: str
+
+
+_users = MemoryTier(USER_CACHE_SIZE)
+_users_lock = threading.Lock()
+
+
+def _verify(token: str) -> int:
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
     except JWTError:
@@ -21,6 +41,61 @@ def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
     if not uid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
     try:
-        return int(uid)
+        uid = int(uid)
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user id")
+
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _tokens_lock:
+            _tokens.set(hashlib.sha256(token.encode()).hexdigest(), Entry(uid, exp, exp))
+    return uid
+
+
+def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    with _tokens_lock:
+        entry = _tokens.get(hashlib.sha256(token.encode()).hexdigest())
+    if entry is not None:
+        return entry.value
+    return _verify(token)
+
+
+def get_current_user(user_id: int = Depends(get_current_user_id)) -> CurrentUser:
+    """The caller's id/email/role, cached for USER_CACHE_TTL seconds."""
+    key = str(user_id)
+    with _users_lock:
+        entry = _users.get(key)
+    if entry is not None:
+        return entry.value
+    with SessionLocal() as db:
+        row = db.execute(select(User.id, User.email, User.role).where(User.id == user_id)).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    user = CurrentUser(row.id, row.email, row.role or "user")
+    until = time.time() + USER_CACHE_TTL
+    with _users_lock:
+        _users.set(key, Entry(user, until, until))
+    return user
+
+
+def require_role(*roles: str):
+    """Dependency factory: `Depends(require_role("admin"))` rejects other roles with 403."""
+    def check(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+        if user.role not in roles:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role")
+        return user
+    return check
+
+
+def invalidate_user(user_id: int) -> None:
+    with _users_lock:
+        _users.delete(str(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    # ORM writes in this process drop the cached role at once; other processes catch up within USER_CACHE_TTL
+    invalidate_user(target.id)
@@ -0,0 +1,91 @@
+import base64, json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session, load_only, selectinload
+from .db import get_db
+from .deps import get_current_user_id
+from .models import Document, Insight
+from .schemas import DocumentPage, InsightPage
+
+router = APIRouter(prefix="/api", tags=["feed"])
+
+# everything but the (potentially huge) content column
+_DOC_COLUMNS = (Document.id, Document.source, Document.title, Document.url, Document.meta, Document.created_at)
+
+
+def _encode_cursor(created_at: datetime, id_: int) -> str:
+    raw = json.dumps([created_at.isoformat(), id_]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, id_ = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(id_)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page(db: Session, model, stmt, limit: int, cursor: Optional[str]):
+    """
+    Newest-first keyset page over (created_at, id) for an already user-filtered
+    statement: served straight off the (user_id, created_at DESC, id DESC)
+    index, so page N costs the same as page 1.
+
+    The cursor row's created_at is read back from the table rather than bound
+    from the cursor: SQLite keeps server-default timestamps as text without
+    microseconds, and a bound datetime (which has them) would sort the cursor
+    row below itself. The encoded timestamp is only the fallback for a
+    cursor row that has since been deleted.
+    """
+    if cursor:
+        created_at, id_ = _decode_cursor(cursor)
+        stored = select(model.created_at).where(model.id == id_).scalar_subquery()
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(func.coalesce(stored, created_at), id_))
+    rows = db.execute(stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)).scalars().all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (_encode_cursor(rows[-1].created_at, rows[-1].id) if more else None)
+
+
+def _document(doc: Document, include_content: bool, include_insights: bool) -> Dict[str, Any]:
+    out = {c.key: getattr(doc, c.key) for c in _DOC_COLUMNS}
+    if include_content:
+        out["content"] = doc.content
+    if include_insights:
+        out["insights"] = doc.insights
+    return out
+
+
+@router.get("/documents", response_model=DocumentPage)
+def list_documents(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    source: Optional[str] = Query(None, description="Only documents from this source (news, url, upload)"),
+    include_content: bool = Query(False, description="Also return the full document text"),
+    include_insights: bool = Query(True),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    columns = _DOC_COLUMNS + ((Document.content,) if include_content else ())
+    stmt = select(Document).options(load_only(*columns)).where(Document.user_id == user_id)
+    if source:
+        stmt = stmt.where(Document.source == source)
+    if include_insights:
+        # one extra IN query for the whole page instead of one per document
+        stmt = stmt.options(selectinload(Document.insights))
+    docs, next_cursor = _page(db, Document, stmt, limit, cursor)
+    return {"items": [_document(d, include_content, include_insights) for d in docs], "next_cursor": next_cursor}
+
+
+@router.get("/insights", response_model=InsightPage)
+def list_insights(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    insights, next_cursor = _page(db, Insight, select(Insight).where(Insight.user_id == user_id), limit, cursor)
+    return {"items": insights, "next_cursor": next_cursor}
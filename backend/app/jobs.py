@@ -0,0 +1,186 @@
+"""
+Durable task runner.
+
+Tasks are rows in `tasks`. Workers claim `queued` rows whose `run_after`
+has passed (or `running` rows whose lease expired) with
+SELECT ... FOR UPDATE SKIP LOCKED, keep the lease alive with a heartbeat
+thread while they work, and either finish the task or put it back in the
+queue with exponential backoff.
+
+Run with:  python -m app.jobs [--workers N]
+"""
+import argparse, logging, multiprocessing, os, random, signal, socket, threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, bindparam, or_, select, update
+from sqlalchemy.orm import Session
+from .db import SessionLocal
+from .models import Task
+from .agent.orchestrator import execute_task
+from .config import (
+    JOB_WORKERS, JOB_POLL_INTERVAL, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_BACKOFF_BASE,
+)
+
+log = logging.getLogger("app.jobs")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, user_id: Optional[int], kind: str, payload: Dict[str, Any],
+            max_attempts: int = JOB_MAX_ATTEMPTS) -> Task:
+    task = Task(user_id=user_id, kind=kind, input=payload, status="queued",
+                max_attempts=max_attempts, run_after=_now())
+    db.add(task); db.commit(); db.refresh(task)
+    return task
+
+
+def _claim_stmt(now: datetime):
+    return (
+        select(Task)
+        # rendered inline: a planner can't match the partial ix_tasks_active against bound parameters
+        .where(Task.status.in_(bindparam("active", ("queued", "running"), expanding=True, literal_execute=True)))
+        .where(or_(
+            and_(Task.status == "queued", Task.run_after <= now),
+            and_(Task.status == "running", Task.lease_expires_at < now),  # worker died mid-task
+        ))
+        .order_by(Task.run_after, Task.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def claim(db: Session, worker_id: str) -> Optional[Task]:
+    """
+    Lease the next runnable task to `worker_id`. A task whose lease expired
+    with no attempts left (its worker died on every try: OOM, a native
+    crash, SIGKILL) is marked `error` instead of being run again.
+    """
+    while True:
+        now = _now()
+        task = db.execute(_claim_stmt(now)).scalar_one_or_none()
+        if task is None:
+            db.rollback()
+            return None
+        if task.status == "running" and (task.attempts or 0) >= task.max_attempts:
+            error = f"worker {task.locked_by} lost the task on attempt {task.attempts}; giving up"
+            task.status = "error"; task.result = {"error": error}; task.last_error = error
+            task.locked_by = None; task.lease_expires_at = None
+            db.commit()
+            log.error(f"task {task.id} failed permanently: {error}")
+            continue
+        break
+    task.status = "running"
+    task.locked_by = worker_id
+    task.lease_expires_at = now + timedelta(seconds=JOB_LEASE_SECONDS)
+    task.heartbeat_at = now
+    task.attempts = (task.attempts or 0) + 1
+    db.commit()
+    return task
+
+
+class _Heartbeat(threading.Thread):
+    """Extends the task lease every third of its length until stopped."""
+
+    def __init__(self, task_id: int, worker_id: str):
+        super().__init__(daemon=True)
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(JOB_LEASE_SECONDS / 3):
+            now = _now()
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(Task)
+                        .where(Task.id == self.task_id, Task.locked_by == self.worker_id)
+                        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=JOB_LEASE_SECONDS))
+                    )
+                    db.commit()
+            except Exception as e:
+                log.warning(f"heartbeat for task {self.task_id} failed: {e}")
+
+
+def _still_ours(db: Session, task: Task, worker_id: str) -> bool:
+    owner = db.execute(
+        select(Task.locked_by).where(Task.id == task.id).with_for_update()
+    ).scalar_one_or_none()
+    return owner == worker_id
+
+
+def process(db: Session, task: Task, worker_id: str) -> None:
+    heartbeat = _Heartbeat(task.id, worker_id)
+    heartbeat.start()
+    try:
+        results = execute_task(db, task, task.user_id)
+        if not _still_ours(db, task, worker_id):
+            log.warning(f"lost lease on task {task.id}; discarding results")
+            db.rollback()
+            return
+        task.status = "done"; task.result = {"items": results}
+        task.locked_by = None; task.lease_expires_at = None; task.last_error = None
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if not _still_ours(db, task, worker_id):
+            db.rollback()
+            return
+        task.last_error = str(e)
+        task.locked_by = None; task.lease_expires_at = None
+        if task.attempts < task.max_attempts:
+            delay = JOB_BACKOFF_BASE * 2 ** (task.attempts - 1)
+            task.status = "queued"
+            task.run_after = _now() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            log.warning(f"task {task.id} failed (attempt {task.attempts}), retrying in ~{delay:.0f}s: {e}")
+        else:
+            task.status = "error"; task.result = {"error": str(e)}
+            log.error(f"task {task.id} failed permanently: {e}")
+        db.commit()
+    finally:
+        heartbeat.stopped.set()
+
+
+def work(worker_id: str, stop: Optional[threading.Event] = None) -> None:
+    stop = stop or threading.Event()
+    log.info(f"worker {worker_id} started")
+    while not stop.is_set():
+        with SessionLocal() as db:
+            task = claim(db, worker_id)
+            if task is not None:
+                log.info(f"worker {worker_id} running task {task.id} ({task.kind})")
+                process(db, task, worker_id)
+                continue
+        stop.wait(JOB_POLL_INTERVAL)
+
+
+def _worker_main(index: int) -> None:
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    work(f"{socket.gethostname()}:{os.getpid()}:{index}", stop)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run task queue workers")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args()
+
+    procs = [multiprocessing.Process(target=_worker_main, args=(i,)) for i in range(args.workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import asyncio, hashlib, json, logging, re, sqlite3, threading, time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .config import LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_MAX_ROWS
+
+log = logging.getLogger(__name__)
+_WS = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    return _WS.sub(" ", prompt).strip()
+
+
+def cache_key(provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode()).hexdigest()
+    raw = json.dumps([provider, model, prompt_hash, params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    Memoizes LLM completions by (provider, model, normalized prompt hash, params).
+
+    A bounded in-process LRU sits in front of an SQLite file shared by every
+    worker on the host. Entries expire after their TTL; the disk tier is
+    trimmed back to `max_rows` least recently used rows.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL,
+                 memory_entries: int = LLM_CACHE_MEMORY_ENTRIES, max_rows: int = LLM_CACHE_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    # ---- disk tier ----
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, provider TEXT, model TEXT, value TEXT,"
+                " expires_at REAL, accessed_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Any, float]]:
+        try:
+            db = self._db()
+            if db is None:
+                return None
+            row = db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            return json.loads(row[0]), row[1]
+        except sqlite3.Error as e:
+            log.warning(f"llm cache read failed: {e}")
+            return None
+
+    def _disk_set(self, key: str, provider: str, model: str, value: Any, expires_at: float) -> None:
+        try:
+            db = self._db()
+            if db is None:
+                return
+            now = time.time()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, provider, model, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            if self._writes % 500 == 0:
+                self._evict(db, now)
+        except sqlite3.Error as e:
+            log.warning(f"llm cache write failed: {e}")
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        cur = db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        removed = cur.rowcount
+        excess = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_rows
+        if excess > 0:
+            cur = db.execute(
+                "DELETE FROM llm_cache WHERE key IN"
+                " (SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            removed += cur.rowcount
+        self.stats["evictions"] += max(removed, 0)
+
+    # ---- public API ----
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and item[1] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return item[0]
+        item = self._disk_get(key)
+        with self._lock:
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, item)
+        return item[0]
+
+    def _remember(self, key: str, item: Tuple[Any, float]) -> None:
+        self._memory[key] = item
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def set(self, key: str, value: Any, provider: str = "", model: str = "", ttl: Optional[int] = None) -> None:
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, (value, expires_at))
+            self.stats["writes"] += 1
+        self._disk_set(key, provider, model, value, expires_at)
+
+    def cached(self, provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]],
+               fn: Callable[[], Any], ttl: Optional[int] = None,
+               cacheable: Callable[[Any], bool] = lambda v: True) -> Any:
+        key = cache_key(provider, model, prompt, params)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        value = fn()
+        if cacheable(value):
+            self.set(key, value, provider, model, ttl)
+        return value
+
+    async def aget(self, provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]]) -> Optional[Any]:
+        return await asyncio.to_thread(self.get, cache_key(provider, model, prompt, params))
+
+    async def aset(self, provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]],
+                   value: Any, ttl: Optional[int] = None) -> None:
+        await asyncio.to_thread(self.set, cache_key(provider, model, prompt, params), value, provider, model, ttl)
+
+    async def acached(self, provider: str, model: str, prompt: str, params: Optional[Dict[str, Any]],
+                      fn: Callable[[], Awaitable[Any]], ttl: Optional[int] = None,
+                      cacheable: Callable[[Any], bool] = lambda v: True) -> Any:
+        key = cache_key(provider, model, prompt, params)
+        hit = await asyncio.to_thread(self.get, key)
+        if hit is not None:
+            return hit
+        value = await fn()
+        if cacheable(value):
+            await asyncio.to_thread(self.set, key, value, provider, model, ttl)
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, memory_entries=len(self._memory))
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+llm_cache = LLMCache()
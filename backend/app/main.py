@@ -1,114 +1,144 @@
 # main.py
-from fastapi import FastAPI, Depends, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, FastAPI, Depends, UploadFile, File, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from fastapi.logger import logger
-from .db import Base, engine
+from starlette.concurrency import run_in_threadpool
+from .db import Base, engine, dispose_engines
 from .auth import router as auth_router
 from .worker import router as worker_router
 from .connectors_router import router as connectors_router
-from .deps import get_current_user_id
+from .tasks_router import router as tasks_router
+from .search_router import router as search_router
+from .feed_router import router as feed_router
+from .search import run_index_sync, save_index
+from .deps import CurrentUser, get_current_user
+from .connectors.http_client import open_http, close_http
+from .connectors.newsapi import fetch_news_async
+from .connectors.alphavantage import fetch_stock_async
+from .trends import refresh_trends
+from .connectors.gemini import gemini_chat_async, gemini_stream_async
+from .cache import news_cache, stock_cache, trend_cache, run_refresher
+from .config import DB_CREATE_ALL, SEARCH_SYNC_INTERVAL, TREND_REFRESH_INTERVAL, TREND_REFRESH_TOP
+from .utils.uploads import UploadLimitMiddleware, upload_buffer, read_text_prefix
+from .utils.pdf import extract_pdf_text, shutdown_pdf_pool
+from .security import shutdown_hash_pool
+from .utils.text import condense
+from .utils.sse import sse_response
 from dotenv import load_dotenv
-import pandas as pd
-import os, requests, io, hashlib, time
-from datetime import datetime, timedelta, timezone
-from collections import Counter
-from PyPDF2 import PdfReader
-import httpx
+import os, hashlib, json, asyncio
+from datetime import datetime
+from typing import Optional
 import logging
 
 # ----------------- SETUP -----------------
 load_dotenv()
+router = APIRouter()
+
+
+def _create_schema() -> None:
+    # dev / single-box deploys only; everywhere else the schema belongs to `alembic upgrade head`
+    Base.metadata.create_all(bind=engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_CREATE_ALL:
+        await run_in_threadpool(_create_schema)
+    await open_http()
+    refresher = asyncio.create_task(run_refresher(trend_cache, TREND_REFRESH_INTERVAL, TREND_REFRESH_TOP))
+    # the search index and its snapshot belong to the API process; job workers only write documents
+    indexer = asyncio.create_task(run_index_sync(SEARCH_SYNC_INTERVAL))
+    yield
+    refresher.cancel()
+    indexer.cancel()
+    await close_http()
+    shutdown_pdf_pool()
+    shutdown_hash_pool()
+    save_index()
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="AI Worker API", version="0.1.0", lifespan=lifespan)
+
+    # Routers
+    app.include_router(auth_router)
+    app.include_router(worker_router)
+    app.include_router(connectors_router)
+    app.include_router(tasks_router)
+    app.include_router(search_router)
+    app.include_router(feed_router)
+    app.include_router(router)
+
+    # oversized uploads are refused before Starlette spools the body
+    app.add_middleware(UploadLimitMiddleware)
+
+    # CORS for local dev
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
 
-app = FastAPI(title="AI Worker API", version="0.1.0")
-
-# Routers
-app.include_router(auth_router)
-app.include_router(worker_router)
-app.include_router(connectors_router)
-
-# CORS for local dev
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Database tables
-Base.metadata.create_all(bind=engine)
 
 # API keys
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY")
-GEMINI_API = os.getenv("GEMINI_API_URL", "http://127.0.0.1:8000/api/gemini")
-
-# In-memory cache
-_TREND_CACHE = {}
-_TREND_TTL_SECONDS = 300  # 5 minutes
+_NO_INSIGHTS = "No insights available"
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 
 # ----------------- UTILITY -----------------
-def _cache_get(key: str):
-    item = _TREND_CACHE.get(key)
-    if not item:
-        return None
-    if time.time() > item["exp"]:
-        _TREND_CACHE.pop(key, None)
-        return None
-    return item["data"]
-
-
-def _cache_set(key: str, data):
-    _TREND_CACHE[key] = {"data": data, "exp": time.time() + _TREND_TTL_SECONDS}
-
-
-async def call_gemini(prompt: str, timeout: int = 10):
+async def call_gemini(prompt: str, cache_params: Optional[dict] = None, batch_group: Optional[str] = None):
+    # goes through the shared Gemini client: rate limited, retried; small prompts of one batch_group batched
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            res = await client.post(GEMINI_API, json={"prompt": prompt})
-            res.raise_for_status()
-            return res.json().get("text", "No insights available")
+        result = await gemini_chat_async(prompt, batch_group=batch_group, cache_params=cache_params)
     except Exception as e:
         logger.error(f"Gemini API error: {e}")
-        return "No insights available"
+        return _NO_INSIGHTS
+    if "error" in result:
+        logger.error(f"Gemini API error ({result.get('status')}): {result['error']}")
+        return _NO_INSIGHTS
+    return result["text"]
 
 
 # ----------------- HEALTH -----------------
-@app.get("/health")
+@router.get("/health")
 def health():
     return {"status": "ok"}
 
 
-@app.get("/me")
-def me(user_id: int = Depends(get_current_user_id)):
-    return {"user_id": user_id}
+@router.get("/me")
+def me(user: CurrentUser = Depends(get_current_user)):
+    return {"user_id": user.id, "email": user.email, "role": user.role}
 
 
 # ----------------- NEWS API -----------------
-@app.get("/api/news/latest")
-def get_latest_news():
+@router.get("/api/news/latest")
+async def get_latest_news():
     if not NEWS_API_KEY:
         raise HTTPException(status_code=500, detail="Missing NEWS_API_KEY")
-    url = f"https://newsapi.org/v2/everything?q=artificial+intelligence&sortBy=publishedAt&pageSize=10&apiKey={NEWS_API_KEY}"
     try:
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
+        articles = await news_cache.get_or_load(
+            "latest:artificial intelligence:10",
+            lambda: fetch_news_async("artificial intelligence", page_size=10, language=None),
+        )
     except Exception as e:
         logger.error(f"News API error: {e}")
         raise HTTPException(status_code=500, detail="News API failed")
 
-    data = res.json()
-    articles = data.get("articles", [])
     formatted = [
         {
             "title": a.get("title"),
             "url": a.get("url"),
-            "source": a.get("source", {}).get("name", "Unknown"),
-            "publishedAt": a.get("publishedAt"),
+            "source": a["meta"].get("source") or "Unknown",
+            "publishedAt": a["meta"].get("publishedAt"),
         }
         for a in articles
     ]
@@ -116,15 +146,12 @@ def get_latest_news():
 
 
 # ----------------- STOCK API -----------------
-@app.get("/api/stock/{symbol}")
-def get_stock(symbol: str):
+@router.get("/api/stock/{symbol}")
+async def get_stock(symbol: str):
     if not ALPHA_VANTAGE_KEY:
         raise HTTPException(status_code=500, detail="Missing ALPHA_VANTAGE_KEY")
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&apikey={ALPHA_VANTAGE_KEY}"
     try:
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-        raw = res.json()
+        raw = await stock_cache.get_or_load(symbol.upper(), lambda: fetch_stock_async(symbol))
     except Exception as e:
         logger.error(f"Stock API error: {e}")
         raise HTTPException(status_code=500, detail="Stock API failed")
@@ -157,53 +184,75 @@ def get_stock(symbol: str):
 
 
 # ----------------- FILE UPLOAD -----------------
-@app.post("/api/upload")
-async def upload_file(file: UploadFile = File(...)):
-    contents = await file.read()
+@router.post("/api/upload")
+async def upload_file(
+    request: Request,
+    file: UploadFile = File(...),
+    stream: bool = Query(False, description="Stream ai_insights as server-sent events"),
+):
     filename = file.filename.lower()
+    if not filename.endswith((".csv", ".txt", ".pdf")):
+        raise HTTPException(status_code=400, detail="Unsupported file type")
 
-    # ---------- CSV ----------
-    if filename.endswith(".csv"):
-        try:
-            df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
-            preview = df.head().to_dict()
-            insights = await call_gemini(f"Analyze this dataset:\n{df.head(20).to_csv(index=False)}")
-            return {
+    buf = upload_buffer(file)
+    try:
+        # ---------- CSV ----------
+        if filename.endswith(".csv"):
+            try:
+                from .utils.profiling import profile_csv  # pandas loads on the first CSV, not at startup
+                stats = await run_in_threadpool(profile_csv, buf)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"CSV parsing failed: {str(e)}")
+            prompt = (
+                f"Analyze this dataset of {stats['rows']} rows.\n"
+                f"Column profile:\n{json.dumps(stats['profile'], default=str)}\n"
+                f"Sample rows:\n{stats['sample']}"
+            )
+            payload = {
                 "type": "csv",
-                "preview": preview,
-                "rows": len(df),
-                "columns": list(df.columns),
-                "ai_insights": insights
+                "preview": stats["preview"],
+                "rows": stats["rows"],
+                "columns": stats["columns"],
+                "profile": stats["profile"],
             }
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"CSV parsing failed: {str(e)}")
-
-    # ---------- TXT ----------
-    elif filename.endswith(".txt"):
-        text = contents.decode("utf-8")
-        preview = text[:500]
-        insights = await call_gemini(f"Summarize and extract insights from this text:\n{preview}")
-        return {"type": "txt", "preview": preview, "ai_insights": insights}
-
-    # ---------- PDF ----------
-    elif filename.endswith(".pdf"):
-        try:
-            pdf = PdfReader(io.BytesIO(contents))
-            text = ""
-            for page in pdf.pages[:3]:
-                text += page.extract_text() + "\n"
-            insights = await call_gemini(f"Summarize and extract insights from this PDF:\n{text[:2000]}")
-            return {"type": "pdf", "preview": text[:500], "ai_insights": insights}
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"PDF parsing failed: {str(e)}")
-
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file type")
+
+        # ---------- TXT ----------
+        elif filename.endswith(".txt"):
+            preview = read_text_prefix(buf, 500)
+            prompt = f"Summarize and extract insights from this text:\n{preview}"
+            payload = {"type": "txt", "preview": preview}
+
+        # ---------- PDF ----------
+        else:
+            try:
+                pdf = await extract_pdf_text(buf)
+                text = pdf["text"]
+                # extractive digest of the whole document, not only its first 2,000 chars;
+                # no LLM calls here, so Gemini (and the SSE stream) starts right away
+                digest = await run_in_threadpool(condense, text, 8000)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"PDF parsing failed: {str(e)}")
+            prompt = f"Summarize and extract insights from this PDF:\n{digest}"
+            payload = {
+                "type": "pdf",
+                "preview": text[:500],
+                "page_count": pdf["page_count"],
+                "pages_extracted": pdf["pages_extracted"],
+                "truncated": pdf["truncated"],
+            }
+    finally:
+        await file.close()
+
+    if stream:
+        # file details go out at once as the `meta` event; insights follow token by token
+        return sse_response(request, gemini_stream_async(prompt), meta=payload)
+    payload["ai_insights"] = await call_gemini(prompt)
+    return payload
 
 
 # ----------------- AI Weekly Trends -----------------
-@app.get("/api/trends")
-def get_ai_trends(
+@router.get("/api/trends")
+async def get_ai_trends(
     query: str = Query("artificial intelligence", alias="query"),
     days: int = Query(7, ge=1, le=30),
     page_size: int = Query(100, ge=20, le=100),
@@ -212,47 +261,16 @@ def get_ai_trends(
         raise HTTPException(status_code=500, detail="Missing NEWS_API_KEY")
 
     ck = hashlib.sha1(f"{query}:{days}:{page_size}".encode()).hexdigest()
-    cached = _cache_get(ck)
-    if cached:
-        return cached
-
-    now = datetime.now(timezone.utc)
-    since = now - timedelta(days=days)
-    url = (
-        "https://newsapi.org/v2/everything"
-        f"?q={requests.utils.quote(query)}"
-        f"&from={since.isoformat(timespec='seconds').replace('+00:00','Z')}"
-        f"&to={now.isoformat(timespec='seconds').replace('+00:00','Z')}"
-        f"&sortBy=publishedAt&language=en&pageSize={page_size}&apiKey={NEWS_API_KEY}"
-    )
+    return await trend_cache.get_or_load(ck, lambda: _load_trends(query, days, page_size))
+
+
+async def _load_trends(query: str, days: int, page_size: int):
     try:
-        res = requests.get(url, timeout=10)
-        res.raise_for_status()
-        body = res.json()
+        series = await refresh_trends(query, days, page_size)
     except Exception as e:
         logger.error(f"News API error: {e}")
-        if cached:
-            return cached
         raise HTTPException(status_code=500, detail="News API failed")
 
-    if body.get("status") != "ok":
-        if cached:
-            return cached
-        raise HTTPException(status_code=500, detail=body.get("message", "News API error"))
-
-    articles = body.get("articles", [])
-    counts = Counter()
-    for art in articles:
-        ts = art.get("publishedAt")
-        if ts:
-            try:
-                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                counts[dt.date().isoformat()] += 1
-            except Exception:
-                continue
-
-    series = [{"date": (since + timedelta(days=i+1)).date().isoformat(), "count": counts.get((since + timedelta(days=i+1)).date().isoformat(), 0)} for i in range(days)]
-
     payload = {
         "series": series,
         "meta": {
@@ -260,17 +278,20 @@ def get_ai_trends(
             "days": days,
             "totalArticles": sum(c["count"] for c in series),
             "generatedAt": datetime.utcnow().isoformat() + "Z",
-            "note": "Cached for 5 minutes to respect rate limits."
+            "note": "Per-day NewsAPI totals; finished days are stored once, recent days are refreshed. Cached for 5 minutes."
         }
     }
-    _cache_set(ck, payload)
     return payload
 
 
 # ----------------- DAILY INSIGHTS -----------------
-@app.get("/api/insights/daily")
+@router.get("/api/insights/daily")
 async def get_daily_insights():
     # Example: fetch top news, generate summaries with Gemini
     prompt = "Fetch top AI news for today and summarize key themes."
-    summary = await call_gemini(prompt)
-    return {"date": datetime.utcnow().date().isoformat(), "themes": summary}
+    today = datetime.utcnow().date().isoformat()
+    summary = await call_gemini(prompt, cache_params={"date": today}, batch_group="public")
+    return {"date": today, "themes": summary}
+
+
+app = create_app()
@@ -0,0 +1,35 @@
+"""
+Bring the database schema up to date before the API starts.
+
+Databases created by the original `create_all` at import time have the
+baseline tables but no `alembic_version`; those are stamped at the
+baseline revision first, so `upgrade head` adds the later columns and
+indexes instead of trying to create the tables again.
+
+Run with:  python -m app.migrate
+"""
+import logging, os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from .db import engine
+
+log = logging.getLogger("app.migrate")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = "e6730d76d067"  # users, documents, insights, tasks as create_all used to build them
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" not in tables and "users" in tables:
+        log.info(f"unversioned schema found, stamping baseline {BASELINE}")
+        command.stamp(cfg, BASELINE)
+    command.upgrade(cfg, "head")
+
+
+if __name__ == "__main__":
+    main()
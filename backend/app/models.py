@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, Date, DateTime, Text, ForeignKey, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -23,7 +23,18 @@ class Document(Base):
     url = Column(String(1024), nullable=True)
     content = Column(Text, nullable=False)
     meta = Column(JSON, nullable=True)
+    url_hash = Column(String(64), nullable=True)         # sha256 of the normalized url
+    simhash = Column(BigInteger, nullable=True)          # 64-bit content fingerprint (see app.dedupe)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    insights = relationship("Insight", back_populates="document", order_by="Insight.id")
+    __table_args__ = (
+        # one row per (owner, article); unowned rows (user_id NULL) share owner key 0
+        Index("ux_documents_owner_url_hash", func.coalesce(user_id, 0), url_hash, unique=True),
+        Index("ix_documents_url_hash", "url_hash"),
+        Index("ix_documents_simhash", "simhash"),
+        Index("ix_documents_user_created", "user_id", created_at.desc(), id.desc()),
+        Index("ix_documents_source_created", "source", created_at.desc()),
+    )
 
 class Insight(Base):
     __tablename__ = "insights"
@@ -34,6 +45,11 @@ class Insight(Base):
     topics = Column(JSON, nullable=True)                 # ["finance","ai","policy"]
     sentiment = Column(String(32), nullable=True)        # "positive|neutral|negative"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    document = relationship("Document", back_populates="insights")
+    __table_args__ = (
+        Index("ix_insights_document_id", "document_id"),
+        Index("ix_insights_user_created", "user_id", created_at.desc(), id.desc()),
+    )
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -43,5 +59,45 @@ class Task(Base):
     input = Column(JSON, nullable=True)                  # payload (query,url,file_id)
     status = Column(String(32), default="queued")        # queued|running|done|error
     result = Column(JSON, nullable=True)                 # summary, counts, etc.
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=3, server_default="3")
+    run_after = Column(DateTime(timezone=True), server_default=func.now())  # not claimable before this (retry backoff)
+    locked_by = Column(String(64), nullable=True)        # worker id holding the lease
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())    
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        Index("ix_tasks_user_created", "user_id", created_at.desc()),
+        # only live tasks are polled, so keep finished ones out of the claim index
+        Index("ix_tasks_active", "status", "run_after",
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+class TrendArticle(Base):
+    # one row per (query, article); the unique key makes re-fetching overlapping windows idempotent
+    __tablename__ = "trend_articles"
+    id = Column(Integer, primary_key=True)
+    query = Column(String(255), nullable=False)
+    url_hash = Column(String(40), nullable=False)       # sha1 of the article url
+    day = Column(Date, nullable=False)
+    published_at = Column(DateTime(timezone=True), nullable=False)
+    __table_args__ = (
+        UniqueConstraint("query", "url_hash", name="uq_trend_articles_query_url"),
+        Index("ix_trend_articles_query_published", "query", "published_at"),
+    )
+
+class TrendBucket(Base):
+    # per-day article count per query (NewsAPI totalResults); `complete` days are never fetched again
+    __tablename__ = "trend_buckets"
+    id = Column(Integer, primary_key=True)
+    query = Column(String(255), nullable=False)
+    day = Column(Date, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    complete = Column(Boolean, nullable=False, default=False, server_default=text("false"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        UniqueConstraint("query", "day", name="uq_trend_buckets_query_day"),
+    )
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field, AnyUrl
 from typing import Optional, List, Dict, Any
+from datetime import datetime
+from .config import TASK_MAX_CONCURRENCY, TASK_MAX_RATE_LIMIT
 
 class RegisterIn(BaseModel):
     name: str = Field(..., min_length=2)
@@ -44,19 +46,51 @@ class InsightOut(BaseModel):
     summary: str
     topics: Optional[List[str]] = None
     sentiment: Optional[str] = None
+    created_at: Optional[datetime] = None
     class Config: orm_mode = True
 
+class FeedDocumentOut(BaseModel):
+    id: int
+    source: str
+    title: Optional[str] = None
+    url: Optional[str] = None
+    meta: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    content: Optional[str] = None              # only with include_content=true
+    insights: List[InsightOut] = []
+
+class DocumentPage(BaseModel):
+    items: List[FeedDocumentOut]
+    next_cursor: Optional[str] = None          # pass back as ?cursor= for the next page
+
+class InsightPage(BaseModel):
+    items: List[InsightOut]
+    next_cursor: Optional[str] = None
+
+class SearchHit(BaseModel):
+    document_id: int
+    score: float
+    title: Optional[str] = None
+    url: Optional[str] = None
+    source: str
+    summary: Optional[str] = None
+    created_at: Optional[datetime] = None
+
 class TaskCreate(BaseModel):
     kind: str                        # 'news'|'url'|'file'
     query: Optional[str] = None      # for news
     url: Optional[AnyUrl] = None     # for url
     file_id: Optional[int] = None    # if you later add file uploads
+    concurrency: Optional[int] = Field(None, ge=1, le=TASK_MAX_CONCURRENCY)      # parallel analyses; default TASK_CONCURRENCY
+    rate_limit: Optional[float] = Field(None, gt=0, le=TASK_MAX_RATE_LIMIT)     # analyses started per second; default TASK_RATE_LIMIT
 
 class TaskOut(BaseModel):
     id: int
     kind: str
     status: str
     result: Optional[Dict[str, Any]] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
     class Config: orm_mode = True
 
 class GeminiPrompt(BaseModel):
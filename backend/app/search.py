@@ -0,0 +1,232 @@
+import asyncio, json, logging, os, tempfile, threading, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from .config import SEARCH_INDEX_PATH, SEARCH_QUERY_SYNC, SEARCH_SAVE_INTERVAL
+from .db import SessionLocal
+from .models import Document, Insight
+from .utils.embeddings import dimension, embed
+from .utils.watermark import Watermark
+
+log = logging.getLogger(__name__)
+
+# Optional: without faiss-cpu the search endpoint answers 503 and ingest skips indexing.
+# Imported on first use so API startup does not pay for it.
+faiss = None
+
+
+def _load_faiss() -> bool:
+    global faiss
+    if faiss is None:
+        try:
+            import faiss as _faiss  # type: ignore
+        except ImportError:
+            return False
+        faiss = _faiss
+    return True
+
+
+def _doc_text(title: Optional[str], content: str) -> str:
+    return f"{title or ''}\n{content}"
+
+
+def _mktemp(folder: str, suffix: str) -> str:
+    fd, path = tempfile.mkstemp(dir=folder, suffix=suffix)
+    os.close(fd)
+    return path
+
+
+class VectorIndex:
+    """
+    HNSW inner-product index over document embeddings, keyed by document id.
+
+    Only the API process builds it: `sync` embeds committed documents the
+    watermark has not seen (so ids committed out of order or after a slow
+    transaction are still picked up, and rolled-back ones never are). The
+    index is snapshotted to `path` with the watermark in a JSON sidecar and
+    read back memory-mapped where the faiss build supports it; since every
+    snapshot is built from the DB, whichever process wrote last, it covers
+    exactly the ids its watermark says.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_PATH):
+        self.path = path
+        self.dim = dimension()
+        self.mark = Watermark()
+        self.lock = threading.Lock()
+        self._syncing = threading.Lock()  # one fetch -> add -> advance at a time
+        self._dirty = False
+        self._saved_at = 0.0
+        self.index = self._load() or self._empty()
+
+    def _empty(self):
+        hnsw = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efSearch = 64
+        return faiss.IndexIDMap2(hnsw)
+
+    def _load(self):
+        meta_path = self.path + ".json"
+        if not (os.path.exists(self.path) and os.path.exists(meta_path)):
+            return None
+        try:
+            try:
+                index = faiss.read_index(self.path, faiss.IO_FLAG_MMAP)
+            except RuntimeError:
+                index = faiss.read_index(self.path)
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if index.d != self.dim:
+                log.warning("search index dimension changed; rebuilding")
+                return None
+            self.mark = Watermark.from_dict(meta)
+            return index
+        except Exception as e:
+            log.warning(f"could not load search index, rebuilding: {e}")
+            return None
+
+    def add(self, items: Sequence[Tuple[int, Optional[str], str]]) -> None:
+        """Embed and index committed (document_id, title, content) rows."""
+        if not items:
+            return
+        vecs = embed([_doc_text(title, content) for _, title, content in items])
+        ids = [i for i, _, _ in items]
+        with self.lock:
+            self.index.add_with_ids(vecs, np.asarray(ids, dtype=np.int64))
+            self.mark.advance(ids)
+            self._dirty = True
+        self.maybe_save()
+
+    def sync(self, db: Session, batch: int = 500, limit: Optional[int] = None, wait: bool = True) -> int:
+        """
+        Embed documents committed since the last sync, at most `limit` of
+        them; returns how many were added. Only one sync runs at a time: with
+        `wait=False` a call that finds one in progress returns 0 at once.
+        """
+        if not self._syncing.acquire(blocking=wait):
+            return 0
+        try:
+            added = 0
+            while limit is None or added < limit:
+                n = batch if limit is None else min(batch, limit - added)
+                rows = self.mark.fetch(db, Document.title, Document.content, batch=n)
+                if not rows:
+                    break
+                self.add([tuple(r) for r in rows])
+                added += len(rows)
+            return added
+        finally:
+            self._syncing.release()
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        vec = embed([query])
+        with self.lock:
+            if self.index.ntotal == 0:
+                return []
+            scores, ids = self.index.search(vec, min(k, self.index.ntotal))
+        return [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i != -1]
+
+    def maybe_save(self, force: bool = False) -> None:
+        if not self._dirty or (not force and time.time() - self._saved_at < SEARCH_SAVE_INTERVAL):
+            return
+        with self.lock:
+            # per-writer temp files: several API workers may snapshot at once
+            folder = os.path.dirname(os.path.abspath(self.path))
+            tmp, tmp_meta = (_mktemp(folder, suffix) for suffix in (".tmp", ".tmp.json"))
+            try:
+                faiss.write_index(self.index, tmp)
+                with open(tmp_meta, "w") as f:
+                    json.dump({**self.mark.to_dict(), "dim": self.dim}, f)
+                os.replace(tmp, self.path)
+                os.replace(tmp_meta, self.path + ".json")
+                self._dirty = False
+            except Exception as e:
+                log.warning(f"could not save search index: {e}")
+            finally:
+                for leftover in (tmp, tmp_meta):
+                    if os.path.exists(leftover):
+                        os.unlink(leftover)
+            self._saved_at = time.time()
+
+
+_INDEX: Optional[VectorIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index() -> Optional[VectorIndex]:
+    global _INDEX
+    if not _load_faiss():
+        return None
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = VectorIndex()
+    return _INDEX
+
+
+def sync_index() -> int:
+    """Catch the local index up with committed documents, through its own session."""
+    index = get_index()
+    if index is None:
+        return 0
+    with SessionLocal() as db:
+        return index.sync(db)
+
+
+async def run_index_sync(interval: float) -> None:
+    """Embed new documents in the background so searches rarely have to; run from the API lifespan."""
+    while True:
+        try:
+            await run_in_threadpool(sync_index)
+        except Exception as e:
+            log.warning(f"search index sync failed: {e}")
+        await asyncio.sleep(interval)
+
+
+def save_index() -> None:
+    if _INDEX is not None:
+        _INDEX.maybe_save(force=True)
+
+
+def semantic_search(db: Session, query: str, user_id: int, k: int = 10,
+                    mine_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    Top-k documents for `query` visible to `user_id` (own documents plus
+    shared ones with no owner). Over-fetches from the index and filters by
+    owner in one DB query, widening the search until k hits are found.
+    """
+    index = get_index()
+    if index is None:
+        raise RuntimeError("faiss is not installed")
+    # pick up a few fresh documents; the background sync embeds the backlog
+    index.sync(db, batch=SEARCH_QUERY_SYNC, limit=SEARCH_QUERY_SYNC, wait=False)
+
+    owner = Document.user_id == user_id if mine_only else or_(Document.user_id == user_id, Document.user_id.is_(None))
+    fetch = k * 4
+    while True:
+        hits = index.search(query, fetch)
+        ids = [i for i, _ in hits]
+        docs = {
+            d.id: d for d in db.execute(
+                select(Document.id, Document.title, Document.url, Document.source, Document.created_at)
+                .where(Document.id.in_(ids), owner)
+            ).all()
+        } if ids else {}
+        results = [
+            {"document_id": i, "score": score, "title": docs[i].title, "url": docs[i].url,
+             "source": docs[i].source, "created_at": docs[i].created_at}
+            for i, score in hits if i in docs
+        ][:k]
+        if len(results) >= k or len(hits) < fetch:
+            break
+        fetch *= 4
+
+    # attach the latest insight of each hit
+    summaries = dict(db.execute(
+        select(Insight.document_id, Insight.summary)
+        .where(Insight.document_id.in_([r["document_id"] for r in results]))
+        .order_by(Insight.id)
+    ).all()) if results else {}
+    for r in results:
+        r["summary"] = summaries.get(r["document_id"])
+    return results
@@ -0,0 +1,25 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from .db import get_db
+from .deps import get_current_user_id
+from .schemas import SearchHit
+from .search import semantic_search
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+@router.get("/search", response_model=List[SearchHit])
+async def search(
+    q: str = Query(..., min_length=2),
+    k: int = Query(10, ge=1, le=100),
+    mine_only: bool = Query(False, description="Only the caller's own documents (default also includes shared news)"),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    try:
+        # embedding + faiss + DB filtering are all blocking work
+        return await run_in_threadpool(semantic_search, db, q, user_id, k, mine_only)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
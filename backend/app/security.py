@@ -1,7 +1,10 @@
-import os, datetime as dt
+import asyncio, os, threading, time, datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
-from typing import Optional
+from typing import Optional, Tuple
+from .config import BCRYPT_ROUNDS, BCRYPT_WORKERS, BCRYPT_QUEUE, BCRYPT_TIMEOUT
 
 
 JWT_SECRET = os.getenv("JWT_SECRET", "changeme")
@@ -9,7 +12,15 @@ JWT_ALG = os.getenv("JWT_ALG", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
 
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt gets its own small pool so a login burst can't starve the shared
+# threadpool every sync route runs on; bcrypt releases the GIL while hashing
+_POOL: Optional[ThreadPoolExecutor] = None
+_ADMIT_LOCK = threading.Lock()
+_in_flight = 0
+# running estimate of one hash in CPU seconds, seeded with ~250 ms at cost 12 and corrected by measurement
+_hash_seconds = 0.25 * 2 ** (BCRYPT_ROUNDS - 12)
 
 
 def hash_password(password: str) -> str:
@@ -20,8 +31,88 @@ def verify_password(password: str, hashed: str) -> bool:
     return pwd_ctx.verify(password, hashed)
 
 
+def _get_pool() -> ThreadPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+    return _POOL
+
+
+def shutdown_hash_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+def hash_capacity() -> int:
+    """
+    How many hashes may be queued or running at once: BCRYPT_QUEUE if set,
+    otherwise as many as the pool can finish within BCRYPT_TIMEOUT at the
+    measured cost per hash. Hashing is CPU-bound, so workers beyond the
+    number of cores add no throughput.
+    """
+    if BCRYPT_QUEUE > 0:
+        return BCRYPT_QUEUE
+    workers = min(BCRYPT_WORKERS, os.cpu_count() or 1)
+    return max(workers, int(workers * BCRYPT_TIMEOUT / _hash_seconds))
+
+
+def _timed(fn, *args):
+    global _hash_seconds
+    start = time.thread_time()  # CPU time, so sharing a core doesn't inflate the estimate
+    try:
+        return fn(*args)
+    finally:
+        _hash_seconds = 0.8 * _hash_seconds + 0.2 * (time.thread_time() - start)
+
+
+def _release(_job) -> None:
+    global _in_flight
+    with _ADMIT_LOCK:
+        _in_flight -= 1
+
+
+def _unavailable(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail, headers={"Retry-After": "1"})
+
+
+async def _offload(fn, *args):
+    """
+    Run `fn` on the bcrypt pool. A caller that could not be served within
+    BCRYPT_TIMEOUT (see `hash_capacity`) gets a 503 right away instead of
+    waiting behind the burst; the timeout itself only backs that up.
+    """
+    global _in_flight
+    with _ADMIT_LOCK:
+        if _in_flight >= hash_capacity():
+            raise _unavailable("Too many logins, retry shortly")
+        _in_flight += 1
+    # the slot is held until the hash really finishes (or is dropped from the
+    # queue), not just until this caller gives up on it
+    try:
+        job = _get_pool().submit(_timed, fn, *args)
+    except BaseException:
+        _release(None)  # e.g. the pool is shutting down; the hash never started
+        raise
+    job.add_done_callback(_release)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(job), BCRYPT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise _unavailable("Password check timed out")
+
+
+async def hash_password_async(password: str) -> str:
+    return await _offload(pwd_ctx.hash, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(matches, new_hash); new_hash is set when the stored hash uses an outdated cost."""
+    return await _offload(pwd_ctx.verify_and_update, password, hashed)
+
+
 def create_access_token(sub: str, extra: Optional[dict] = None) -> str:
     to_encode = {"sub": sub, "exp": dt.datetime.utcnow() + dt.timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)}
     if extra:
         to_encode.update(extra)
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALG)
\ No newline at end of file
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALG)
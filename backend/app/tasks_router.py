@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .db import get_db
+from .deps import get_current_user_id
+from .jobs import enqueue
+from .models import Task
+from .schemas import TaskCreate, TaskOut
+
+router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+
+
+@router.post("", response_model=TaskOut, status_code=202)
+def create_task(body: TaskCreate, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    if body.kind == "news":
+        payload = {"query": body.query or "technology"}
+    elif body.kind == "url":
+        if not body.url:
+            raise HTTPException(status_code=400, detail="url is required for url tasks")
+        payload = {"url": str(body.url)}
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported task kind: {body.kind}")
+    # read back by execute_task; left out so the worker's defaults apply
+    if body.concurrency is not None:
+        payload["concurrency"] = body.concurrency
+    if body.rate_limit is not None:
+        payload["rate_limit"] = body.rate_limit
+    return enqueue(db, user_id, body.kind, payload)
+
+
+@router.get("/{task_id}", response_model=TaskOut)
+def get_task(task_id: int, db: Session = Depends(get_db), user_id: int = Depends(get_current_user_id)):
+    task = db.get(Task, task_id)
+    if task is None or task.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
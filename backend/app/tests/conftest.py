@@ -0,0 +1,19 @@
+import os, tempfile
+
+# point the app at a throwaway SQLite database before anything imports app.db
+_TMP = tempfile.mkdtemp(prefix="aiworker-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'test.db')}")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(_TMP, "search.faiss"))
+
+import pytest
+
+
+@pytest.fixture
+def db():
+    from app.db import Base, SessionLocal, engine
+    import app.models  # noqa: F401  (register tables)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        yield session
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from app import cache as cache_mod
+from app.cache import Cache, MemoryTier, SharedTier
+from app.connectors import alphavantage
+
+
+class FakeRedis:
+    """Dict-backed stand-in for redis.asyncio.Redis (get/set/delete only)."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(cache_mod.time, "time", c)
+    return c
+
+
+def _counting(values):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        value = values[min(len(calls), len(values)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return loader, calls
+
+
+def test_concurrent_misses_share_one_load(clock):
+    c = Cache("t", ttl=60, shared=SharedTier(FakeRedis()))
+    loader, calls = _counting(["v"])
+
+    async def burst():
+        return await asyncio.gather(*(c.get_or_load("k", loader) for _ in range(10)))
+
+    assert asyncio.run(burst()) == ["v"] * 10
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    c = Cache("t", ttl=60, stale_ttl=60, shared=SharedTier(FakeRedis()))
+    loader, calls = _counting(["old", "new"])
+
+    async def scenario():
+        assert await c.get_or_load("k", loader) == "old"
+        clock.now += 90  # past fresh, inside stale
+        served = [await c.get_or_load("k", loader) for _ in range(3)]
+        await asyncio.gather(*c._bg)
+        return served, await c.get_or_load("k", loader)
+
+    served, after = asyncio.run(scenario())
+    assert served == ["old"] * 3 and after == "new"
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_loaded_again(clock):
+    c = Cache("t", ttl=60, stale_ttl=60, shared=SharedTier(FakeRedis()))
+    loader, calls = _counting(["old", "new"])
+
+    async def scenario():
+        await c.get_or_load("k", loader)
+        clock.now += 200
+        return await c.get_or_load("k", loader)
+
+    assert asyncio.run(scenario()) == "new" and len(calls) == 2
+
+
+def test_memory_tier_evicts_least_recently_used(clock):
+    tier = MemoryTier(max_entries=2)
+    entry = cache_mod.Entry("v", clock.now + 10, clock.now + 10)
+    tier.set("a", entry)
+    tier.set("b", entry)
+    tier.get("a")  # a is now the most recent
+    tier.set("c", entry)
+    assert tier.get("b") is None
+    assert tier.get("a") is entry and tier.get("c") is entry
+
+
+def test_shared_tier_serves_other_workers(clock):
+    redis = FakeRedis()
+    first = Cache("t", ttl=60, shared=SharedTier(redis))
+    second = Cache("t", ttl=60, shared=SharedTier(redis))  # another worker process
+    loader, calls = _counting(["v"])
+
+    async def scenario():
+        await first.get_or_load("k", loader)
+        return await second.get_or_load("k", loader)
+
+    assert asyncio.run(scenario()) == "v" and len(calls) == 1
+
+
+def test_rate_limit_payload_is_not_cached_over_last_good(clock, monkeypatch):
+    good = {"Meta Data": {}, alphavantage.SERIES_KEY: {"2026-10-16": {}}}
+    limited = {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+    responses = iter([good, limited])
+
+    class Response:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    class Client:
+        async def get(self, url, params, timeout):
+            return Response(next(responses))
+
+    monkeypatch.setattr(alphavantage, "get_client", lambda: Client())
+    c = Cache("stock", ttl=60, fallback_ttl=3600, shared=SharedTier(FakeRedis()))
+
+    async def scenario():
+        first = await c.get_or_load("IBM", lambda: alphavantage.fetch_stock_async("IBM"))
+        clock.now += 120
+        second = await c.get_or_load("IBM", lambda: alphavantage.fetch_stock_async("IBM"))
+        return first, second, await c.get_entry("IBM")
+
+    first, second, entry = asyncio.run(scenario())
+    assert first == good and second == good
+    assert entry is None or entry.value == good  # the Note was never stored
+
+    with pytest.raises(alphavantage.AlphaVantageError, match="rate limit"):
+        alphavantage._checked(limited)
@@ -0,0 +1,65 @@
+from sqlalchemy import select
+from app.agent.orchestrator import _ingest
+from app.dedupe import fingerprint
+from app.models import Document, Insight, User
+
+ARTICLE = {"source": "news", "title": "Chips", "url": "https://www.example.com/chips?utm_source=x",
+           "content": "Chip makers report record demand for accelerators. Supply stays tight."}
+
+
+def _users(db):
+    users = [User(name=n, email=f"{n}@x.io", password_hash="-") for n in ("ann", "bob")]
+    db.add_all(users)
+    db.commit()
+    return [u.id for u in users]
+
+
+def test_same_url_from_two_users_stays_owned_by_each(db):
+    ann, bob = _users(db)
+    shared = Document(source="news", url="https://example.com/chips", content=ARTICLE["content"])
+    fingerprint(shared)
+    db.add(shared)  # stored first by the trend ingest, no owner
+    db.commit()
+
+    [a] = _ingest(db, ann, [dict(ARTICLE)], concurrency=1, rate=0)
+    [b] = _ingest(db, bob, [dict(ARTICLE)], concurrency=1, rate=0)
+    db.commit()
+
+    assert len({a["document_id"], b["document_id"], shared.id}) == 3
+    assert db.get(Document, a["document_id"]).user_id == ann
+    assert db.get(Document, b["document_id"]).user_id == bob
+    # bob's insight is reused from ann's analysis but attached to bob's own document
+    ins_b = db.get(Insight, b["insight_id"])
+    assert ins_b.user_id == bob and ins_b.document_id == b["document_id"]
+    assert ins_b.summary == db.get(Insight, a["insight_id"]).summary
+
+
+def test_repeat_ingest_by_the_same_user_is_a_duplicate(db):
+    ann, _ = _users(db)
+    [first] = _ingest(db, ann, [dict(ARTICLE)], concurrency=1, rate=0)
+    db.commit()
+    [again] = _ingest(db, ann, [dict(ARTICLE, url="http://example.com/chips/")], concurrency=1, rate=0)
+    db.commit()
+
+    assert again["duplicate"] and again["document_id"] == first["document_id"]
+    assert again["insight_id"] == first["insight_id"]
+    assert len(db.execute(select(Document).where(Document.user_id == ann)).scalars().all()) == 1
+
+
+def test_resubmitted_url_with_a_changed_page_is_analyzed_again(db):
+    ann, _ = _users(db)
+    page = {"source": "url", "title": "Status", "url": "https://example.com/status"}
+    [first] = _ingest(db, ann, [dict(page, content="All systems are operational across every region today.")],
+                      concurrency=1, rate=0)
+    db.commit()
+    [same] = _ingest(db, ann, [dict(page, content="All systems are operational across every region today.")],
+                     concurrency=1, rate=0)
+    db.commit()
+    [changed] = _ingest(db, ann, [dict(page, content="Major outage: payments are failing in the EU region since noon.")],
+                        concurrency=1, rate=0)
+    db.commit()
+
+    assert same["duplicate"] and same["document_id"] == first["document_id"]
+    assert not changed.get("duplicate")
+    assert changed["document_id"] != first["document_id"] and changed["insight_id"] != first["insight_id"]
+    assert "outage" in db.get(Insight, changed["insight_id"]).summary.lower()
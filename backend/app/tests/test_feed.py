@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+from app.deps import get_current_user_id
+from app.main import create_app
+from app.models import Document, Insight, User
+
+
+def _client(user_id: int) -> TestClient:
+    app = create_app()
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    return TestClient(app)
+
+
+def _walk(client, path, limit):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        body = client.get(path, params=params).json()
+        pages.append([item["id"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor or len(pages) > 10:
+            return pages
+
+
+def test_pages_walk_rows_sharing_a_server_default_timestamp(db):
+    user = User(name="ann", email="ann@x.io", password_hash="-")
+    db.add(user)
+    db.commit()
+    # one commit, created_at left to the database: every row gets the same second
+    docs = [Document(user_id=user.id, source="url", content=f"doc {i}") for i in range(10)]
+    db.add_all(docs)
+    db.flush()
+    db.add_all([Insight(user_id=user.id, document_id=d.id, summary="s") for d in docs])
+    db.commit()
+
+    client = _client(user.id)
+    for path in ("/api/documents", "/api/insights"):
+        pages = _walk(client, path, 3)
+        ids = [i for page in pages for i in page]
+        assert [len(p) for p in pages] == [3, 3, 3, 1]
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == 10
@@ -0,0 +1,141 @@
+import asyncio
+from email.utils import formatdate
+import httpx
+import pytest
+from app.connectors import gemini
+from app.utils.ratelimit import TokenBucket
+
+
+def _answer(text, status=200, headers=None):
+    body = {"candidates": [{"content": {"parts": [{"text": text}]}}]} if status == 200 else {"error": text}
+    return httpx.Response(status, json=body, headers=headers or {})
+
+
+class FakeClient:
+    """Stands in for the shared httpx.AsyncClient; `reply(body)` decides each answer."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append(kwargs.get("json"))
+        return self.reply(kwargs.get("json"))
+
+
+@pytest.fixture
+def client():
+    c = gemini.GeminiClient()
+    c.bucket = TokenBucket(1000, 1000)
+    return c
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(gemini.asyncio, "sleep", sleep)
+    return delays
+
+
+def _texts(body):
+    return [p["text"] for p in body["contents"][0]["parts"]]
+
+
+def test_retry_after_accepts_seconds_and_dates():
+    assert gemini._retry_after({"Retry-After": "7"}) == 7
+    assert 55 <= gemini._retry_after({"Retry-After": formatdate(gemini.time.time() + 60, usegmt=True)}) <= 60
+    assert gemini._retry_after({"Retry-After": "soon"}) is None
+    assert gemini._retry_after({}) is None
+
+
+def test_backoff_is_jittered_capped_and_never_below_retry_after(monkeypatch):
+    monkeypatch.setattr(gemini, "GEMINI_BACKOFF_BASE", 1.0)
+    monkeypatch.setattr(gemini, "GEMINI_BACKOFF_MAX", 30.0)
+    delays = [gemini._backoff(3, None) for _ in range(200)]
+    assert all(4 <= d <= 8 for d in delays) and len(set(delays)) > 1
+    assert all(gemini._backoff(10, None) <= 30 for _ in range(50))
+    assert gemini._backoff(0, 12.0) == 12.0
+
+
+def test_429_is_retried_after_the_servers_delay(client, sleeps, monkeypatch):
+    answers = iter([_answer("slow down", 429, {"Retry-After": "3"}), _answer("done")])
+    fake = FakeClient(lambda body: next(answers))
+    monkeypatch.setattr(gemini, "get_client", lambda: fake)
+
+    result = asyncio.run(client.generate(["hi"]))
+    assert result == {"text": "done"}
+    assert len(fake.requests) == 2 and sleeps == [3.0]
+
+
+def test_non_retryable_status_is_returned_at_once(client, sleeps, monkeypatch):
+    fake = FakeClient(lambda body: _answer("bad request", 400))
+    monkeypatch.setattr(gemini, "get_client", lambda: fake)
+    result = asyncio.run(client.generate(["hi"]))
+    assert result["status"] == 400 and len(fake.requests) == 1 and not sleeps
+
+
+def _batching(client, monkeypatch, reply):
+    monkeypatch.setattr(gemini, "GEMINI_BATCH_WINDOW", 0.01)
+    fake = FakeClient(reply)
+    monkeypatch.setattr(gemini, "get_client", lambda: fake)
+    return fake
+
+
+def test_small_prompts_of_one_group_share_a_request(client, monkeypatch):
+    def reply(body):
+        parts = _texts(body)
+        return _answer("\n".join(f"### {i}\nanswer {i}" for i in range(1, len(parts))))
+
+    fake = _batching(client, monkeypatch, reply)
+
+    async def burst():
+        return await asyncio.gather(*(client.summarize(f"prompt {i}", group="news") for i in range(3)))
+
+    assert asyncio.run(burst()) == [{"text": f"answer {i}"} for i in (1, 2, 3)]
+    assert len(fake.requests) == 1
+
+
+def test_groups_never_share_a_request(client, monkeypatch):
+    fake = _batching(client, monkeypatch, lambda body: _answer(f"only {_texts(body)[0]}"))
+
+    async def burst():
+        return await asyncio.gather(client.summarize("ann's file", group="user:1"),
+                                    client.summarize("bob's file", group="user:2"))
+
+    assert asyncio.run(burst()) == [{"text": "only ann's file"}, {"text": "only bob's file"}]
+    assert sorted(_texts(b) for b in fake.requests) == [["ann's file"], ["bob's file"]]
+
+
+def test_unsplittable_batch_answer_falls_back_to_one_request_each(client, monkeypatch):
+    def reply(body):
+        parts = _texts(body)
+        if len(parts) > 1:
+            return _answer("Here is everything in one paragraph.")  # ignores the ### format
+        return _answer(f"single: {parts[0]}")
+
+    fake = _batching(client, monkeypatch, reply)
+
+    async def burst():
+        return await asyncio.gather(*(client.summarize(f"p{i}", group="news") for i in range(2)))
+
+    assert asyncio.run(burst()) == [{"text": "single: p0"}, {"text": "single: p1"}]
+    assert len(fake.requests) == 3  # the batch, then one per prompt
+
+
+def test_upload_prompts_are_not_batched(monkeypatch):
+    from app import main
+    seen = {}
+
+    async def chat(prompt, batch_group=None, cache_params=None):
+        seen["batch_group"] = batch_group
+        return {"text": "ok"}
+
+    monkeypatch.setattr(main, "gemini_chat_async", chat)
+    assert asyncio.run(main.call_gemini("Summarize this file")) == "ok"
+    assert seen["batch_group"] is None
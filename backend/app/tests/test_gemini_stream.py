@@ -0,0 +1,21 @@
+import httpx
+from fastapi.testclient import TestClient
+from app import connectors_router
+from app.main import create_app
+
+
+def _failing(exc):
+    async def stream(prompt, model):
+        raise exc
+        yield ""  # pragma: no cover  (makes this an async generator)
+    return stream
+
+
+def test_transport_error_before_first_token_is_a_gateway_error(monkeypatch):
+    client = TestClient(create_app())
+    monkeypatch.setattr(connectors_router, "gemini_stream_async", _failing(httpx.ConnectError("refused")))
+    res = client.post("/api/gemini/stream", json={"prompt": "hi"})
+    assert res.status_code == 502 and "unreachable" in res.json()["detail"]
+
+    monkeypatch.setattr(connectors_router, "gemini_stream_async", _failing(httpx.ReadTimeout("slow")))
+    assert client.post("/api/gemini/stream", json={"prompt": "hi"}).status_code == 504
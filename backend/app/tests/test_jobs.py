@@ -0,0 +1,87 @@
+from datetime import timedelta
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from app import jobs
+from app.models import Task
+
+
+def _task(db, **kw):
+    task = jobs.enqueue(db, None, "news", {"query": "chips"})
+    for k, v in kw.items():
+        setattr(task, k, v)
+    db.commit()
+    return task
+
+
+def test_claim_takes_due_tasks_in_order_and_leases_them(db):
+    later = _task(db, run_after=jobs._now() + timedelta(hours=1))
+    first = _task(db)
+    second = _task(db)
+
+    claimed = jobs.claim(db, "w1")
+    assert claimed.id == first.id
+    assert claimed.status == "running" and claimed.locked_by == "w1" and claimed.attempts == 1
+    assert claimed.lease_expires_at is not None
+    assert jobs.claim(db, "w2").id == second.id
+    assert jobs.claim(db, "w3") is None  # `later` is not due, the rest are leased
+    assert db.get(Task, later.id).status == "queued"
+
+
+def test_claim_skips_rows_locked_by_other_workers():
+    sql = str(jobs._claim_stmt(jobs._now()).compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+
+
+def test_claim_can_use_the_partial_active_index(db):
+    sql = []
+    with db.get_bind().connect() as conn:
+        event.listen(conn, "before_cursor_execute", lambda c, cur, stmt, *a: sql.append(stmt))
+        conn.execute(jobs._claim_stmt(jobs._now())).first()
+    assert "status IN ('queued', 'running')" in sql[-1]
+
+
+def test_expired_lease_is_reclaimed(db):
+    task = _task(db, status="running", locked_by="dead", attempts=1,
+                 lease_expires_at=jobs._now() - timedelta(seconds=1))
+    claimed = jobs.claim(db, "w1")
+    assert claimed.id == task.id and claimed.locked_by == "w1" and claimed.attempts == 2
+
+
+def test_live_lease_is_left_alone(db):
+    _task(db, status="running", locked_by="alive", attempts=1,
+          lease_expires_at=jobs._now() + timedelta(seconds=60))
+    assert jobs.claim(db, "w1") is None
+
+
+def test_task_that_keeps_killing_its_worker_ends_in_error(db):
+    crashed = _task(db, status="running", locked_by="dead", attempts=3, max_attempts=3,
+                    lease_expires_at=jobs._now() - timedelta(seconds=1))
+    queued = _task(db)
+
+    assert jobs.claim(db, "w1").id == queued.id
+    db.refresh(crashed)
+    assert crashed.status == "error" and crashed.locked_by is None
+    assert "lost the task" in crashed.last_error
+
+
+def test_failure_is_requeued_with_backoff_then_gives_up(db, monkeypatch):
+    def boom(db, task, user_id):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(jobs, "execute_task", boom)
+    monkeypatch.setattr(jobs, "JOB_BACKOFF_BASE", 10)
+    task = _task(db, max_attempts=2)
+
+    before = jobs._now()
+    jobs.process(db, jobs.claim(db, "w1"), "w1")
+    db.refresh(task)
+    assert task.status == "queued" and task.locked_by is None and task.last_error == "upstream down"
+    delay = (task.run_after.replace(tzinfo=before.tzinfo) - before).total_seconds()
+    assert 8 <= delay <= 12.5
+    assert jobs.claim(db, "w1") is None  # still backing off
+
+    task.run_after = jobs._now() - timedelta(seconds=1)
+    db.commit()
+    jobs.process(db, jobs.claim(db, "w1"), "w1")
+    db.refresh(task)
+    assert task.status == "error" and task.result == {"error": "upstream down"}
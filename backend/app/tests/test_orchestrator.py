@@ -0,0 +1,29 @@
+from app.agent import orchestrator
+from app.db import SessionLocal
+from app.models import Document, Insight, User
+
+ARTICLES = [
+    {"source": "news", "title": f"Story {i}", "url": f"https://example.com/{i}",
+     "content": f"Story number {i} about markets, chips and supply chains."}
+    for i in range(3)
+]
+
+
+def test_nothing_is_written_while_the_llm_runs(db, monkeypatch):
+    def analyze(contents, concurrency, rate):
+        assert not db.new and not db.dirty
+        assert not any(isinstance(obj, Document) for obj in db.identity_map.values())
+        # another writer (a login rehash, a trend refresh) is not blocked meanwhile
+        with SessionLocal() as other:
+            other.add(User(name="cy", email="cy@x.io", password_hash="-"))
+            other.commit()
+            assert other.query(Document).count() == 0
+        return [{"summary": c[:20], "topics": [], "sentiment": "neutral"} for c in contents]
+
+    monkeypatch.setattr(orchestrator, "_analyze_many", analyze)
+    monkeypatch.setattr(orchestrator, "corpus_topics", lambda texts, k: [[] for _ in texts])
+    results = orchestrator._ingest(db, None, [dict(a) for a in ARTICLES], concurrency=1, rate=0)
+    db.commit()
+
+    assert all("insight_id" in r for r in results)
+    assert db.query(Document).count() == 3 and db.query(Insight).count() == 3
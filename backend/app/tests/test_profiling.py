@@ -0,0 +1,32 @@
+import io
+import pandas as pd
+from app.utils.profiling import TopK, profile_csv
+
+
+def test_top_k_keeps_a_value_that_never_leads_a_chunk():
+    top = TopK(k=1, capacity=2)
+    top.update(pd.Series({"a": 10, "b": 10, "hot": 5}))
+    for i in range(20):
+        top.update(pd.Series({"hot": 6, f"c{i}": 1}))
+
+    [best] = top.top()
+    true = 5 + 6 * 20
+    assert best["value"] == "hot"
+    assert true - top.error <= best["count"] <= true
+
+
+def test_top_k_error_stays_within_the_misra_gries_bound():
+    top, rows = TopK(capacity=9), 0
+    for i in range(50):
+        chunk = pd.Series({"hot": 4, **{f"v{i}-{j}": 3 for j in range(12)}})
+        rows += int(chunk.sum())
+        top.update(chunk)
+    assert top.error <= rows / 10
+    assert len(top.counts) <= 9
+
+
+def test_profile_reports_the_undercount():
+    csv = "x\n" + "\n".join(["a"] * 6 + ["b"] * 3 + ["c"])
+    col = profile_csv(io.BytesIO(csv.encode()), chunk_rows=4)["profile"]["x"]
+    assert col["top_values"][0] == {"value": "a", "count": 6}
+    assert col["top_values_max_undercount"] == 0
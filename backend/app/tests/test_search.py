@@ -0,0 +1,72 @@
+import os, threading, time
+import pytest
+from app.models import Document
+from app import search
+from app.db import SessionLocal
+
+pytest.importorskip("faiss")
+
+
+def _doc(db, id_, text):
+    db.add(Document(id=id_, source="url", title=text, content=text))
+    db.commit()
+
+
+def test_late_commits_are_indexed_and_survive_a_snapshot(db, tmp_path):
+    search._load_faiss()
+    path = str(tmp_path / "index.faiss")
+    index = search.VectorIndex(path)
+    _doc(db, 3, "gamma rays")
+    _doc(db, 1, "alpha particles")
+    assert index.sync(db) == 2
+    assert index.mark.gaps.keys() == {2}
+
+    _doc(db, 2, "beta decay")  # committed after a higher id was indexed
+    assert index.sync(db) == 1
+    index.maybe_save(force=True)
+
+    reloaded = search.VectorIndex(path)
+    assert reloaded.index.ntotal == 3
+    assert reloaded.mark.last_id == 3 and not reloaded.mark.gaps
+    assert reloaded.sync(db) == 0
+
+
+def test_concurrent_syncs_index_each_document_once(db, tmp_path, monkeypatch):
+    search._load_faiss()
+    index = search.VectorIndex(str(tmp_path / "index.faiss"))
+    for i in range(1, 6):
+        _doc(db, i, f"document {i}")
+    slow_embed = search.embed
+    monkeypatch.setattr(search, "embed", lambda texts: (time.sleep(0.1), slow_embed(texts))[1])
+
+    def run():
+        with SessionLocal() as s:
+            index.sync(s, batch=2)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert index.index.ntotal == 5
+    assert sorted(i for i, _ in index.search("document", 10)) == [1, 2, 3, 4, 5]
+
+
+def test_search_does_not_wait_for_a_running_sync(db, tmp_path):
+    search._load_faiss()
+    index = search.VectorIndex(str(tmp_path / "index.faiss"))
+    for i in range(1, 4):
+        _doc(db, i, f"document {i}")
+    with index._syncing:
+        assert index.sync(db, wait=False) == 0
+    assert index.sync(db, limit=2) == 2
+    assert index.sync(db) == 1
+
+
+def test_snapshot_leaves_no_temp_files(db, tmp_path):
+    search._load_faiss()
+    index = search.VectorIndex(str(tmp_path / "index.faiss"))
+    _doc(db, 1, "alpha")
+    index.sync(db)
+    index.maybe_save(force=True)
+    assert sorted(os.listdir(tmp_path)) == ["index.faiss", "index.faiss.json"]
@@ -0,0 +1,72 @@
+import asyncio, threading, time
+import pytest
+from fastapi import HTTPException
+from app import security
+
+
+def test_capacity_is_what_the_pool_finishes_within_the_timeout(monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_QUEUE", 0)
+    monkeypatch.setattr(security, "BCRYPT_WORKERS", 2)
+    monkeypatch.setattr(security, "BCRYPT_TIMEOUT", 5.0)
+    monkeypatch.setattr(security.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(security, "_hash_seconds", 0.25)
+    assert security.hash_capacity() == 40
+    monkeypatch.setattr(security.os, "cpu_count", lambda: 1)
+    assert security.hash_capacity() == 20
+    monkeypatch.setattr(security, "BCRYPT_QUEUE", 7)
+    assert security.hash_capacity() == 7
+
+
+def test_over_capacity_is_shed_without_waiting(monkeypatch):
+    monkeypatch.setattr(security, "hash_capacity", lambda: 1)
+    monkeypatch.setattr(security, "_hash_seconds", security._hash_seconds)  # _timed updates it
+    release = threading.Event()
+
+    async def burst():
+        held = asyncio.ensure_future(security._offload(release.wait))
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        with pytest.raises(HTTPException) as exc:
+            await security._offload(release.wait)
+        waited = time.perf_counter() - start
+        release.set()
+        assert await held is True
+        return exc.value, waited
+
+    exc, waited = asyncio.run(burst())
+    assert exc.status_code == 503 and exc.headers["Retry-After"] == "1"
+    assert waited < 0.5
+    assert security._in_flight == 0
+
+
+def test_slot_is_released_when_the_pool_refuses_work(monkeypatch):
+    class ClosedPool:
+        def submit(self, *args):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(security, "_get_pool", lambda: ClosedPool())
+    with pytest.raises(RuntimeError):
+        asyncio.run(security._offload(len, "x"))
+    assert security._in_flight == 0
+
+
+def test_login_upgrades_an_old_hash_through_the_sync_session(db, monkeypatch):
+    from fastapi.testclient import TestClient
+    from passlib.context import CryptContext
+    from app.main import create_app
+    from app.models import User
+
+    old = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("pw123456")
+    db.add(User(name="ann", email="ann@x.io", password_hash=old))
+    db.commit()
+    client = TestClient(create_app())
+
+    assert client.post("/auth/login", json={"email": "ann@x.io", "password": "nope-nope"}).status_code == 401
+    res = client.post("/auth/login", json={"email": "ann@x.io", "password": "pw123456"})
+    assert res.status_code == 200 and res.json()["user"]["email"] == "ann@x.io"
+    db.expire_all()
+    assert db.query(User).one().password_hash.startswith(f"$2b${security.BCRYPT_ROUNDS:02d}$")
+
+    res = client.post("/auth/register", json={"name": "bob", "email": "bob@x.io", "password": "pw123456"})
+    assert res.status_code == 200
+    assert client.post("/auth/register", json={"name": "bob", "email": "bob@x.io", "password": "pw123456"}).status_code == 400
@@ -0,0 +1,26 @@
+import os, re, subprocess, sys
+
+# heavy parsers / SDKs that must load on first use, not when the app starts
+LAZY = ("pandas", "scipy", "faiss", "PyPDF2", "openai", "yfinance")
+# cumulative `import app.main`; ~1.5 s on a dev laptop, headroom for slow CI runners
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _importtime():
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND, capture_output=True, text=True, timeout=120,
+        env={**os.environ, "PYTHONPATH": BACKEND},
+    )
+    assert res.returncode == 0, res.stderr[-2000:]
+    # "import time:      self [us] | cumulative | imported package"
+    rows = re.findall(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$", res.stderr, re.MULTILINE)
+    return {name: int(cumulative) for _, cumulative, _, name in rows}
+
+
+def test_app_import_skips_heavy_modules_and_stays_in_budget():
+    modules = _importtime()
+    loaded = sorted({m.split(".")[0] for m in modules} & set(LAZY))
+    assert not loaded, f"imported at startup: {loaded}"
+    assert modules["app.main"] / 1000 < BUDGET_MS, f"import app.main took {modules['app.main'] / 1000:.0f} ms"
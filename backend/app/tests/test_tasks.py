@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+from app.agent import orchestrator
+from app.deps import get_current_user_id
+from app.main import create_app
+from app.models import Task, User
+
+
+def _client(db) -> TestClient:
+    user = User(name="ann", email="ann@x.io", password_hash="-")
+    db.add(user)
+    db.commit()
+    app = create_app()
+    app.dependency_overrides[get_current_user_id] = lambda: user.id
+    return TestClient(app)
+
+
+def test_task_limits_reach_the_orchestrator(db, monkeypatch):
+    client = _client(db)
+    res = client.post("/api/tasks", json={"kind": "news", "query": "chips", "concurrency": 2, "rate_limit": 0.5})
+    assert res.status_code == 202
+    task = db.get(Task, res.json()["id"])
+    assert task.input == {"query": "chips", "concurrency": 2, "rate_limit": 0.5}
+
+    seen = {}
+    monkeypatch.setattr(orchestrator, "fetch_news", lambda query: [])
+    monkeypatch.setattr(orchestrator, "_ingest",
+                        lambda db, user_id, payloads, concurrency, rate: seen.update(c=concurrency, r=rate) or [])
+    orchestrator.execute_task(db, task, task.user_id)
+    assert seen == {"c": 2, "r": 0.5}
+
+
+def test_task_limits_are_optional_and_bounded(db):
+    client = _client(db)
+    res = client.post("/api/tasks", json={"kind": "news"})
+    assert res.status_code == 202 and db.get(Task, res.json()["id"]).input == {"query": "technology"}
+    for bad in ({"concurrency": 0}, {"concurrency": 10_000}, {"rate_limit": 0}, {"rate_limit": -1}):
+        assert client.post("/api/tasks", json={"kind": "news", **bad}).status_code == 422
@@ -0,0 +1,47 @@
+import threading, time
+from app.agent import orchestrator
+from app.utils import text
+
+
+def test_condense_keeps_document_order_within_budget():
+    doc = " ".join(f"Sentence {i} mentions markets and growth." for i in range(500))
+    digest = text.condense(doc, 400)
+    assert len(digest) <= 400
+    numbers = [int(w) for w in digest.split() if w.isdigit()]
+    assert numbers == sorted(numbers)
+    assert text.condense("short text", 400) == "short text"
+
+
+def test_chunk_calls_share_the_task_gate(monkeypatch):
+    lock, state = threading.Lock(), {"now": 0, "peak": 0}
+
+    def chat(prompt):
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.01)
+        with lock:
+            state["now"] -= 1
+        return "- point"
+
+    monkeypatch.setattr(text, "_openai", lambda: True)
+    monkeypatch.setattr(text, "_chat", chat)
+    monkeypatch.setattr(text, "split_tokens", lambda t: [f"{t[:12]} chunk {i}" for i in range(6)])
+
+    docs = [f"document {i} " * 50 for i in range(4)]
+    results = orchestrator._analyze_many(docs, concurrency=2, rate=0)
+    assert all(r["summary"] for r in results)
+    assert state["peak"] <= 2
+
+
+def test_an_early_edit_keeps_later_chunks_identical(monkeypatch):
+    monkeypatch.setattr(text, "_encoding", lambda: False)  # ~4 chars per token
+    paragraphs = [" ".join(f"Paragraph {p} sentence {s} talks about supply and demand." for s in range(p % 5 + 1))
+                  for p in range(200)]
+    doc = "\n\n".join(paragraphs)
+    before = text.split_tokens(doc, 200)
+    after = text.split_tokens("Editor's note: one new opening line.\n\n" + doc, 200)
+
+    assert all(len(c) <= 200 * 4 for c in before)
+    assert " ".join(before).split() == doc.split()
+    assert len(set(before) & set(after)) >= len(before) - 2
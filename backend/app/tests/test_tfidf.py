@@ -0,0 +1,66 @@
+import os, threading
+from app.models import Document
+from app.utils import tfidf
+from app.utils.tfidf import CorpusStats
+
+
+def _doc(db, id_, text):
+    db.add(Document(id=id_, source="url", content=text))
+    db.commit()
+
+
+def test_sync_picks_up_ids_committed_out_of_order(db):
+    stats = CorpusStats()
+    _doc(db, 2, "second document")
+    assert stats.sync(db) == 1
+    assert 1 in stats.mark.gaps
+
+    _doc(db, 1, "first document")  # lower id, committed later
+    assert stats.sync(db) == 1
+    assert stats.n_docs == 2 and not stats.mark.gaps
+
+
+def test_uncommitted_documents_are_not_counted(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(tfidf, "_STATS", None)
+    monkeypatch.setattr(tfidf, "TFIDF_STATE_PATH", str(tmp_path / "tfidf.npz"))
+    _doc(db, 1, "committed text")
+    db.add(Document(id=2, source="url", content="pending text"))
+    db.flush()  # open transaction, as during an ingest
+
+    tfidf.corpus_topics(["committed text"])
+    assert tfidf._STATS.n_docs == 1
+    db.rollback()
+
+    loaded = CorpusStats.load(str(tmp_path / "tfidf.npz"))
+    assert loaded.n_docs == 1 and loaded.mark.last_id == 1
+
+
+def test_concurrent_saves_each_stage_their_own_file(db, tmp_path):
+    path = str(tmp_path / "state.npz")
+    _doc(db, 1, "alpha beta")
+    stats = CorpusStats()
+    stats.sync(db)
+    errors = []
+
+    def save():
+        try:
+            for _ in range(20):
+                stats.save(path)
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert CorpusStats.load(path).n_docs == 1
+    assert os.listdir(tmp_path) == ["state.npz"]
+
+
+def test_save_failure_does_not_fail_scoring(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(tfidf, "TFIDF_STATE_PATH", str(tmp_path / "missing-dir" / "state.npz"))
+    monkeypatch.setattr(tfidf, "_STATS", None)
+    _doc(db, 1, "alpha beta gamma")
+    assert tfidf.corpus_topics(["alpha alpha delta"], k=1) == [["delta"]]
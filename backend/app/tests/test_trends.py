@@ -0,0 +1,42 @@
+import asyncio
+from app import trends
+
+
+def test_finished_days_are_fetched_once(db, monkeypatch):
+    calls = []
+
+    async def search(query, page_size=5, **params):
+        calls.append(params["from"][:10])
+        return 1000, []  # totalResults well past any paging cap
+
+    monkeypatch.setattr(trends, "search_news_async", search)
+    # otherwise yesterday is still settling between 00:00 and 02:00 UTC and is refetched too
+    monkeypatch.setattr(trends, "TRENDS_SETTLE_HOURS", 0)
+    series = asyncio.run(trends.refresh_trends("ai", 5, 100))
+    assert [c["count"] for c in series] == [1000] * 5
+    assert len(calls) == 5
+
+    calls.clear()
+    asyncio.run(trends.refresh_trends("ai", 5, 100))
+    assert calls == [series[-1]["date"]]  # only today is still open
+
+
+def test_failed_day_is_retried(db, monkeypatch):
+    failing = {"on": True}
+
+    async def search(query, page_size=5, **params):
+        if failing["on"] and params["from"][:10] == first_day:
+            raise RuntimeError("upstream down")
+        return 7, []
+
+    first_day = trends._pending_days("ai", *_window(3))[0].isoformat()
+    monkeypatch.setattr(trends, "search_news_async", search)
+    assert [c["count"] for c in asyncio.run(trends.refresh_trends("ai", 3, 100))] == [0, 7, 7]
+    failing["on"] = False
+    assert [c["count"] for c in asyncio.run(trends.refresh_trends("ai", 3, 100))] == [7, 7, 7]
+
+
+def _window(days):
+    from datetime import datetime, timedelta, timezone
+    end = datetime.now(timezone.utc).date()
+    return end - timedelta(days=days - 1), end
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+from app.main import create_app
+from app.utils.uploads import UploadLimitMiddleware
+
+
+def _client(max_bytes: int) -> TestClient:
+    app = create_app()
+    # rebuild the stack with a small limit
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not UploadLimitMiddleware]
+    app.add_middleware(UploadLimitMiddleware, max_bytes=max_bytes)
+    return TestClient(app)
+
+
+def test_declared_length_over_limit_is_rejected():
+    res = _client(1024).post("/api/upload", files={"file": ("a.txt", b"x" * 4096)})
+    assert res.status_code == 413
+
+
+def test_chunked_body_over_limit_is_cut_off():
+    def body():
+        yield b'--B\r\nContent-Disposition: form-data; name="file"; filename="a.txt"\r\n\r\n'
+        for _ in range(8):
+            yield b"x" * 1024
+        yield b"\r\n--B--\r\n"
+
+    res = _client(4096).post("/api/upload", content=body(),
+                             headers={"content-type": "multipart/form-data; boundary=B"})
+    assert res.status_code == 413
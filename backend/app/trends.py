@@ -0,0 +1,174 @@
+import asyncio, hashlib, logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from .db import SessionLocal
+from .models import Document, TrendArticle, TrendBucket
+from .dedupe import find_duplicates, fingerprint
+from .connectors.newsapi import search_news_async
+from .config import TRENDS_FETCH_CONCURRENCY, TRENDS_SETTLE_HOURS
+
+log = logging.getLogger(__name__)
+_DOC_COLUMNS = ("source", "title", "url", "content", "meta", "url_hash", "simhash")
+
+
+def upsert(db: Session):
+    """Dialect `insert` with on_conflict_* support (Postgres in prod, SQLite locally)."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _published(article: Dict[str, Any]) -> Optional[datetime]:
+    ts = (article.get("meta") or {}).get("publishedAt")
+    if not ts:
+        return None
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00")).astimezone(timezone.utc)
+    except ValueError:
+        return None
+
+
+# ----------------- DB (sync, run in threadpool) -----------------
+def _pending_days(query: str, start: date, end: date) -> List[date]:
+    """Days in [start, end] whose count for `query` is not final yet."""
+    with SessionLocal() as db:
+        done = set(db.execute(
+            select(TrendBucket.day).where(
+                TrendBucket.query == query, TrendBucket.day >= start, TrendBucket.day <= end,
+                TrendBucket.complete.is_(True),
+            )
+        ).scalars())
+    return [d for d in (start + timedelta(days=i) for i in range((end - start).days + 1)) if d not in done]
+
+
+def _record(query: str, counts: Dict[date, Tuple[int, bool]], articles: List[Dict[str, Any]]) -> int:
+    """
+    Write the day buckets (NewsAPI's total per day, replacing any earlier
+    partial count) and store articles not yet seen for `query` as news
+    Documents. Returns the number of new articles.
+    """
+    rows = {}
+    for a in articles:
+        published = _published(a)
+        if not a.get("url") or published is None:
+            continue
+        rows[hashlib.sha1(a["url"].encode()).hexdigest()] = (a, published)
+
+    with SessionLocal() as db:
+        insert = upsert(db)
+        inserted = []
+        if rows:
+            stmt = (
+                insert(TrendArticle)
+                .values([
+                    {"query": query, "url_hash": h, "day": p.date(), "published_at": p}
+                    for h, (_, p) in rows.items()
+                ])
+                .on_conflict_do_nothing(index_elements=["query", "url_hash"])
+                .returning(TrendArticle.url_hash)
+            )
+            inserted = db.execute(stmt).scalars().all()
+
+            # keep the article text around for the orchestrator / feeds
+            docs = [
+                Document(
+                    source="news",
+                    title=a.get("title"),
+                    url=a["url"],
+                    content=a.get("content") or "",
+                    meta={**(a.get("meta") or {}), "query": query},
+                )
+                for h in inserted
+                for a in [rows[h][0]]
+            ]
+            for doc in docs:
+                fingerprint(doc)
+            docs = [doc for doc, dup in zip(docs, find_duplicates(db, docs, None)) if dup is None]
+            if docs:
+                db.execute(
+                    insert(Document)
+                    .values([{c: getattr(d, c) for c in _DOC_COLUMNS} for d in docs])
+                    .on_conflict_do_nothing()  # ux_documents_owner_url_hash: stored by a concurrent refresh
+                )
+
+        if counts:
+            stmt = insert(TrendBucket).values([
+                {"query": query, "day": d, "count": n, "complete": final} for d, (n, final) in counts.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["query", "day"],
+                set_={"count": stmt.excluded.count, "complete": stmt.excluded.complete, "updated_at": func.now()},
+            )
+            db.execute(stmt)
+        db.commit()
+        return len(inserted)
+
+
+def _series(query: str, start: date, end: date) -> List[Dict[str, Any]]:
+    with SessionLocal() as db:
+        counts = dict(db.execute(
+            select(TrendBucket.day, TrendBucket.count)
+            .where(TrendBucket.query == query, TrendBucket.day >= start, TrendBucket.day <= end)
+        ).all())
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "count": counts.get(start + timedelta(days=i), 0)}
+        for i in range((end - start).days + 1)
+    ]
+
+
+# ----------------- NewsAPI -----------------
+async def _fetch_day(query: str, day: date, page_size: int, now: datetime, sem: asyncio.Semaphore):
+    """
+    NewsAPI's totalResults for one UTC day (exact regardless of the plan's
+    paging cap) plus up to `page_size` of its newest articles. The count is
+    final once the day ended TRENDS_SETTLE_HOURS ago.
+    """
+    since = datetime.combine(day, time.min, timezone.utc)
+    until = since + timedelta(days=1)
+    async with sem:
+        total, articles = await search_news_async(
+            query, page_size=page_size, **{"from": _iso(since), "to": _iso(until - timedelta(seconds=1))}
+        )
+    return total, now >= until + timedelta(hours=TRENDS_SETTLE_HOURS), articles
+
+
+async def refresh_trends(query: str, days: int, page_size: int) -> List[Dict[str, Any]]:
+    """
+    Bring the rollup for `query` up to date and return the last `days` day
+    buckets. Only days without a final count are fetched, one pageSize=1
+    request each; the newest day also brings in `page_size` articles.
+    """
+    now = datetime.now(timezone.utc)
+    end = now.date()
+    start = end - timedelta(days=days - 1)
+    pending = await run_in_threadpool(_pending_days, query, start, end)
+
+    if pending:
+        sem = asyncio.Semaphore(TRENDS_FETCH_CONCURRENCY)
+        results = await asyncio.gather(
+            *(_fetch_day(query, d, page_size if d == end else 1, now, sem) for d in pending),
+            return_exceptions=True,
+        )
+        counts, articles = {}, []
+        for day, res in zip(pending, results):
+            if isinstance(res, BaseException):
+                log.warning(f"trend count for {query!r} on {day} failed: {res}")
+                continue
+            total, final, found = res
+            counts[day] = (total, final)
+            articles.extend(found)
+        if not counts and len(pending) == (end - start).days + 1:
+            raise results[0]  # nothing stored for this window and nothing fetched
+        # days that failed keep no final bucket and are retried on the next refresh
+        await run_in_threadpool(_record, query, counts, articles)
+
+    return await run_in_threadpool(_series, query, start, end)
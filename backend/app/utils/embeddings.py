@@ -0,0 +1,50 @@
+import logging, zlib
+from typing import Sequence
+import numpy as np
+from ..config import EMBEDDING_MODEL, EMBEDDING_DIM
+from .text import content_terms
+
+log = logging.getLogger(__name__)
+
+# Optional local model; fall back to a hashing vectorizer so search works offline
+_MODEL = None
+_MODEL_FAILED = False
+
+
+def _model():
+    global _MODEL, _MODEL_FAILED
+    if _MODEL is None and EMBEDDING_MODEL and not _MODEL_FAILED:
+        try:
+            from sentence_transformers import SentenceTransformer  # type: ignore
+            _MODEL = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+        except Exception as e:
+            log.warning(f"embedding model {EMBEDDING_MODEL!r} unavailable, using hashing vectorizer: {e}")
+            _MODEL_FAILED = True
+    return _MODEL
+
+
+def dimension() -> int:
+    model = _model()
+    return model.get_sentence_embedding_dimension() if model is not None else EMBEDDING_DIM
+
+
+def _hash_embed(texts: Sequence[str], dim: int) -> np.ndarray:
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for term in content_terms(text):
+            h = zlib.crc32(term.encode())
+            # signed hashing keeps collisions from only ever adding up
+            out[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+    return np.sign(out) * np.log1p(np.abs(out))
+
+
+def embed(texts: Sequence[str]) -> np.ndarray:
+    """L2-normalized float32 embeddings, one row per text (inner product == cosine)."""
+    model = _model()
+    if model is not None:
+        vecs = np.asarray(model.encode(list(texts), batch_size=32, show_progress_bar=False), dtype=np.float32)
+    else:
+        vecs = _hash_embed(texts, EMBEDDING_DIM)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vecs / norms, dtype=np.float32)
@@ -0,0 +1,125 @@
+import asyncio, io, os, shutil, tempfile, time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from ..config import PDF_MAX_PAGES, PDF_TIME_BUDGET, PDF_PAGES_PER_TASK, PDF_WORKERS
+
+_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _POOL
+
+
+def shutdown_pdf_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
+
+
+@contextmanager
+def _worker_path(buf: BinaryIO) -> Iterator[str]:
+    """
+    A path pool workers can open `buf` by. A file-backed buffer (the upload's
+    spool; a small in-memory one rolls over on fileno()) is shared through
+    /proc/<pid>/fd, so the PDF is not copied again. Without /proc the data
+    goes to a named temp file.
+    """
+    try:
+        fd = buf.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fd = None
+    if fd is not None and os.path.isdir(f"/proc/{os.getpid()}/fd"):
+        buf.flush()
+        yield f"/proc/{os.getpid()}/fd/{fd}"
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        buf.seek(0)
+        shutil.copyfileobj(buf, tmp)
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+
+# ---- run inside pool workers ----
+def _page_count(path: str) -> int:
+    from PyPDF2 import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_range(path: str, start: int, stop: int, deadline: float) -> List[Tuple[int, str]]:
+    from PyPDF2 import PdfReader
+    pages = PdfReader(path).pages
+    out = []
+    for i in range(start, stop):
+        if time.time() > deadline:
+            break
+        out.append((i, pages[i].extract_text() or ""))
+    return out
+
+
+async def iter_pdf_pages(
+    buf: BinaryIO,
+    max_pages: int = PDF_MAX_PAGES,
+    time_budget: float = PDF_TIME_BUDGET,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    stats: Optional[Dict[str, int]] = None,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Extract PDF text on the process pool, one page range per task, and yield
+    (page_index, text) in page order as soon as each page is available.
+    Stops at `max_pages` or once `time_budget` seconds have passed; `stats`
+    (if given) receives page_count / pages_extracted.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    deadline = time.time() + time_budget
+
+    futures: List[asyncio.Future] = []
+    with _worker_path(buf) as path:
+        try:
+            page_count = await loop.run_in_executor(pool, _page_count, path)
+            limit = min(page_count, max_pages)
+            if stats is not None:
+                stats.update(page_count=page_count, pages_extracted=0)
+
+            ranges = [(start, min(start + pages_per_task, limit)) for start in range(0, limit, pages_per_task)]
+            futures = [
+                asyncio.ensure_future(loop.run_in_executor(pool, _extract_range, path, start, stop, deadline))
+                for start, stop in ranges
+            ]
+            # ranges finish out of order; emit pages strictly in order
+            for (start, stop), fut in zip(ranges, futures):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    pages = await asyncio.wait_for(asyncio.shield(fut), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                for page in pages:
+                    if stats is not None:
+                        stats["pages_extracted"] += 1
+                    yield page
+                if len(pages) < stop - start:
+                    break  # worker hit the deadline mid-range
+        finally:
+            for fut in futures:
+                fut.cancel()
+
+
+async def extract_pdf_text(buf: BinaryIO, **kwargs) -> Dict[str, object]:
+    stats: Dict[str, int] = {}
+    parts = [text async for _, text in iter_pdf_pages(buf, stats=stats, **kwargs)]
+    return {
+        "text": "\n".join(parts),
+        "page_count": stats.get("page_count", 0),
+        "pages_extracted": stats.get("pages_extracted", 0),
+        "truncated": stats.get("pages_extracted", 0) < stats.get("page_count", 0),
+    }
@@ -0,0 +1,156 @@
+import json, math
+from collections import Counter
+from typing import Any, BinaryIO, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from ..config import PROFILE_CHUNK_ROWS
+
+
+def _py(v: Any) -> Any:
+    # numpy scalars -> plain python so the profile is JSON-serializable
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    return v
+
+
+class HyperLogLog:
+    """Fixed-size distinct counter (2**p one-byte registers, ~1.6% error at p=12)."""
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        h = hashes.astype(np.uint64, copy=False)
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = h & np.uint64((1 << (64 - self.p)) - 1)
+        width = 64 - self.p
+        # rank = position of the leftmost 1-bit in the remaining bits
+        with np.errstate(divide="ignore"):
+            bits = np.floor(np.log2(rest.astype(np.float64)))
+        rank = np.where(rest == 0, width + 1, width - bits).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        est = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if est <= 2.5 * self.m and zeros:
+            est = self.m * math.log(self.m / zeros)  # small-range correction
+        return int(round(est))
+
+
+class TopK:
+    """
+    Heavy hitters in at most `capacity` counters (Misra-Gries). Whenever the
+    counters overflow, the (capacity+1)-th largest count is subtracted from
+    all of them and the ones left at zero are dropped. A kept count is a
+    lower bound that undercounts by at most `error` <= rows / (capacity+1),
+    and every value more frequent than that is guaranteed to be kept.
+    """
+
+    def __init__(self, k: int = 5, capacity: int = 1000):
+        self.k = k
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+        self.error = 0
+
+    def update(self, value_counts: pd.Series) -> None:
+        for value, n in value_counts.items():
+            self.counts[value] += int(n)
+        if len(self.counts) > self.capacity:
+            counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+            floor = int(np.partition(counts, len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1])
+            self.error += floor
+            self.counts = Counter({v: n - floor for v, n in self.counts.items() if n > floor})
+
+    def top(self) -> List[Dict[str, Any]]:
+        return [{"value": _py(v), "count": n} for v, n in self.counts.most_common(self.k)]
+
+
+class ColumnProfile:
+    def __init__(self, name: str, top_k: int = 5):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.dtypes: List[str] = []
+        self.num_count = 0
+        self.num_sum = 0.0
+        self.min: Any = None
+        self.max: Any = None
+        self.hll = HyperLogLog()
+        self.top = TopK(k=top_k)
+
+    def update(self, s: pd.Series) -> None:
+        self.count += len(s)
+        self.nulls += int(s.isna().sum())
+        dtype = str(s.dtype)
+        if dtype not in self.dtypes:
+            self.dtypes.append(dtype)
+
+        values = s.dropna()
+        if values.empty:
+            return
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            self.num_count += len(values)
+            self.num_sum += float(values.sum())
+            lo, hi = _py(values.min()), _py(values.max())
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        self.hll.add_hashes(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        self.top.update(values.value_counts(sort=False))
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {
+            "dtype": self.dtypes[0] if len(self.dtypes) == 1 else "mixed(" + ",".join(self.dtypes) + ")",
+            "count": self.count,
+            "nulls": self.nulls,
+            "distinct_approx": min(self.hll.count(), self.count - self.nulls),
+            "top_values": self.top.top(),
+            "top_values_max_undercount": self.top.error,
+        }
+        if self.num_count:
+            out.update({"min": self.min, "max": self.max, "mean": _py(self.num_sum / self.num_count)})
+        return out
+
+
+def profile_csv(
+    buf: BinaryIO,
+    chunk_rows: int = PROFILE_CHUNK_ROWS,
+    preview_rows: int = 5,
+    sample_rows: int = 20,
+    encoding: str = "utf-8",
+) -> Dict[str, Any]:
+    """
+    Stream a CSV through pandas in `chunk_rows` chunks and keep running
+    per-column stats (nulls, min/max/mean, HLL distinct count, top values).
+    Memory is bounded by one chunk plus a fixed-size sketch per column.
+    """
+    columns: List[str] = []
+    profiles: Dict[str, ColumnProfile] = {}
+    rows = 0
+    head: Optional[pd.DataFrame] = None
+
+    for chunk in pd.read_csv(buf, encoding=encoding, chunksize=chunk_rows):
+        if head is None:
+            head = chunk.head(max(preview_rows, sample_rows))
+            columns = [str(c) for c in chunk.columns]
+            profiles = {c: ColumnProfile(c) for c in columns}
+        rows += len(chunk)
+        for col, name in zip(chunk.columns, columns):
+            profiles[name].update(chunk[col])
+
+    if head is None:
+        head = pd.DataFrame()
+    return {
+        "rows": rows,
+        "columns": columns,
+        "preview": json.loads(head.head(preview_rows).to_json()),
+        "sample": head.head(sample_rows).to_csv(index=False),
+        "profile": {name: p.to_dict() for name, p in profiles.items()},
+    }
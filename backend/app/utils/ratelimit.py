@@ -0,0 +1,81 @@
+import asyncio, threading, time
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1/rate seconds apart (rate <= 0 disables it)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CallGate:
+    """
+    Context manager capping a group of calls: at most `concurrency` inside
+    at once, entered at most `rate` times per second (rate <= 0: no spacing).
+    Nested fan-out (e.g. per-chunk summaries inside per-document threads)
+    shares the same cap as long as only the leaf calls enter the gate.
+    """
+
+    def __init__(self, concurrency: int, rate: float = 0.0):
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._limiter = RateLimiter(rate)
+
+    def __enter__(self) -> "CallGate":
+        self._slots.acquire()
+        try:
+            self._limiter.acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._slots.release()
+
+
+class TokenBucket:
+    """
+    Token bucket allowing bursts of `burst` calls and `rate` calls/second
+    sustained. Safe to share between threads and event loops: a caller
+    reserves its token under a lock and then sleeps off the deficit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,65 @@
+import json, logging
+from typing import Any, AsyncIterator, Dict, Optional
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+log = logging.getLogger(__name__)
+
+
+def _event(data: Any, event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, default=str)}\n\n"
+
+
+async def _relay(request: Request, chunks: AsyncIterator[str], meta: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+    # one upstream fragment is pulled per event written, so a slow client slows
+    # the upstream read instead of piling text up in memory
+    try:
+        if meta is not None:
+            yield _event(meta, "meta")
+        async for text in chunks:
+            if await request.is_disconnected():
+                log.info("client went away, cancelling upstream stream")
+                return
+            yield _event({"text": text})
+    except Exception as e:
+        log.error(f"stream failed: {e}")
+        yield _event({"detail": str(e)}, "error")
+        return
+    finally:
+        await chunks.aclose()
+    yield _event({}, "done")
+
+
+async def primed(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Pull the first fragment before the response starts, so an upstream that
+    fails outright still turns into a proper HTTP error status.
+    """
+    try:
+        first: Optional[str] = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def chain() -> AsyncIterator[str]:
+        try:
+            if first is not None:
+                yield first
+            async for text in chunks:
+                yield text
+        finally:
+            await chunks.aclose()
+
+    return chain()
+
+
+def sse_response(request: Request, chunks: AsyncIterator[str], meta: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    """
+    Relay text fragments as server-sent events: an optional `meta` event,
+    one unnamed event per fragment ({"text": ...}), then `done` (or `error`).
+    """
+    return StreamingResponse(
+        _relay(request, chunks, meta),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
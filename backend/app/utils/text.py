@@ -1,65 +1,256 @@
-import os, re
-from typing import List, Dict
-import math
+import os, re, zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import ContextManager, Dict, Iterable, List, Optional
+from ..llm_cache import llm_cache
+from ..config import SUMMARY_CHUNK_TOKENS, SUMMARY_CONCURRENCY, SUMMARY_FAN_IN
 
-# Optional OpenAI; fall back to stub summarizer
+# Optional OpenAI; fall back to stub summarizer. The SDK is imported on first use.
 _OPENAI = None
-try:
-    import openai  # type: ignore
-    if os.getenv("OPENAI_API_KEY"):
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        _OPENAI = openai
-except Exception:
-    _OPENAI = None
+
+
+def _openai():
+    global _OPENAI
+    if _OPENAI is None:
+        _OPENAI = False
+        if os.getenv("OPENAI_API_KEY"):
+            try:
+                import openai  # type: ignore
+                openai.api_key = os.getenv("OPENAI_API_KEY")
+                _OPENAI = openai
+            except Exception:
+                pass
+    return _OPENAI
+
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_TOKEN = re.compile(r"\w+")   # maximal word runs; same boundaries as the old \b...\b patterns
+_STOPWORDS = frozenset("with this that from into about were have which their there would shall could should might your just when will them they been being because other every those where while whose meanwhile among after before above below".split())
+_POSITIVE = frozenset("good great gain up positive success improve beat".split())
+_NEGATIVE = frozenset("bad fall down loss negative miss risk issue decline".split())
+
+
+def _is_term(tok: str) -> bool:
+    # equivalent of \b[a-zA-Z]{4,}\b on an already lowercased token
+    return len(tok) >= 4 and tok.isascii() and tok.isalpha()
+
+
+@dataclass
+class TextAnalysis:
+    sentences: List[str]
+    term_freq: Dict[str, int]        # 4+ letter words, in order of first occurrence
+    topics: List[str]
+    sentiment: str
+    summary: str                     # offline extractive summary
+
+
+def analyze_text(text: str, k: int = 5, max_sentences: int = 5) -> TextAnalysis:
+    """
+    One pass over `text`: split sentences, tokenize each once, and derive
+    term frequencies, topics, sentiment and the extractive summary from the
+    same tokens. Matches the standalone helpers below.
+    """
+    sentences = _split_sentences(text)
+    freq: Dict[str, int] = {}
+    sent_terms: List[List[str]] = []
+    pos = neg = 0
+    for sent in sentences:
+        terms = []
+        for tok in _TOKEN.findall(sent.lower()):
+            if tok in _POSITIVE:
+                pos += 1
+            elif tok in _NEGATIVE:
+                neg += 1
+            if _is_term(tok):
+                terms.append(tok)
+                freq[tok] = freq.get(tok, 0) + 1
+        sent_terms.append(terms)
+
+    if len(sentences) <= max_sentences:
+        summary = text.strip()
+    else:
+        score = [
+            (sum(freq[w] for w in terms) / (len(terms) + 1e-6), s)
+            for terms, s in zip(sent_terms, sentences)
+        ]
+        summary = " ".join(s for _, s in sorted(score, key=lambda x: x[0], reverse=True)[:max_sentences])
+
+    ranked = sorted(((w, n) for w, n in freq.items() if w not in _STOPWORDS), key=lambda x: x[1], reverse=True)
+    topics = [w for w, _ in ranked[:k]]
+
+    if abs(pos - neg) <= 1:
+        sentiment = "neutral"
+    else:
+        sentiment = "positive" if pos > neg else "negative"
+    return TextAnalysis(sentences, freq, topics, sentiment, summary)
+
+
+def content_terms(text: str) -> List[str]:
+    """Topic-candidate tokens of `text` (4+ letters, no stopwords), in order."""
+    return [t for t in _TOKEN.findall(text.lower()) if _is_term(t) and t not in _STOPWORDS]
+
+
+def analyze_batch(texts: Iterable[str], k: int = 5, max_sentences: int = 5) -> List[TextAnalysis]:
+    return [analyze_text(t, k=k, max_sentences=max_sentences) for t in texts]
+
 
 def _split_sentences(text: str) -> List[str]:
-    return re.split(r'(?<=[.!?])\s+', text.strip())
+    return _SENT_SPLIT.split(text.strip())
 
 def simple_extractive_summary(text: str, max_sentences: int = 5) -> str:
     # naive frequency-based summary for offline use
+    return analyze_text(text, max_sentences=max_sentences).summary
+
+def condense(text: str, max_chars: int) -> str:
+    """
+    Extractive digest of `text` within `max_chars`: the best-scoring
+    sentences (same scoring as analyze_text), kept in document order.
+    No LLM calls, so it is cheap enough for the request path.
+    """
+    if len(text) <= max_chars:
+        return text
     sentences = _split_sentences(text)
-    if len(sentences) <= max_sentences:
-        return text.strip()
-    words = re.findall(r"\b[a-zA-Z]{4,}\b", text.lower())
-    freq = {}
-    for w in words: freq[w] = freq.get(w, 0) + 1
-    score = []
-    for s in sentences:
-        sw = re.findall(r"\b[a-zA-Z]{4,}\b", s.lower())
-        sc = sum(freq.get(w, 0) for w in sw) / (len(sw) + 1e-6)
-        score.append((sc, s))
-    top = [s for _, s in sorted(score, key=lambda x: x[0], reverse=True)[:max_sentences]]
-    return " ".join(top)
-
-def summarize(text: str) -> str:
-    if _OPENAI:
+    sent_terms = [[t for t in _TOKEN.findall(s.lower()) if _is_term(t)] for s in sentences]
+    freq = Counter(t for terms in sent_terms for t in terms)
+    score = [sum(freq[w] for w in terms) / (len(terms) + 1e-6) for terms in sent_terms]
+    picked, used = [], 0
+    for i in sorted(range(len(sentences)), key=score.__getitem__, reverse=True):
+        size = min(len(sentences[i]), max_chars) + 1
+        if used + size <= max_chars + 1:
+            picked.append(i)
+            used += size
+    return " ".join(sentences[i][:max_chars] for i in sorted(picked))
+
+_MODEL = "gpt-4o-mini"
+_SYSTEM_PROMPT = "You concisely summarize text for busy analysts."
+_ENCODING = None
+
+
+def _encoding():
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken  # type: ignore
+            _ENCODING = tiktoken.get_encoding("o200k_base")  # gpt-4o family
+        except Exception:
+            _ENCODING = False
+    return _ENCODING
+
+
+_PARAGRAPH = re.compile(r"\S.*?(?:\n\s*\n\s*|\Z)", re.S)
+_SENTENCE = re.compile(r"\S.*?(?:(?<=[.!?])\s+|\Z)", re.S)
+
+
+def split_tokens(text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """
+    Split `text` into pieces of at most `max_tokens` tokens (≈4 chars/token without tiktoken).
+
+    Pieces are whole paragraphs (sentences, for paragraphs over the budget)
+    packed up to the budget. A piece also ends after any unit whose content
+    hash picks it as a cut point, about every max_tokens/2 tokens; that choice
+    depends only on the unit's own text, so an edit moves boundaries only up
+    to the next such cut and later sections keep their chunk cache entries.
+    """
+    enc = _encoding()
+    if enc:
+        def count(s: str) -> int:
+            return len(enc.encode(s, disallowed_special=()))
+
+        def cut(s: str) -> List[str]:
+            tokens = enc.encode(s, disallowed_special=())
+            return [enc.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    else:
+        def count(s: str) -> int:
+            return -(-len(s) // 4)
+
+        def cut(s: str) -> List[str]:
+            return [s[i:i + max_tokens * 4] for i in range(0, len(s), max_tokens * 4)]
+
+    def units() -> Iterable[str]:
+        for para in _PARAGRAPH.findall(text):
+            if count(para) <= max_tokens:
+                yield para
+                continue
+            for sentence in _SENTENCE.findall(para):
+                if count(sentence) <= max_tokens:
+                    yield sentence
+                else:
+                    yield from cut(sentence)  # no boundary to respect inside one huge sentence
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for unit in units():
+        n = count(unit)
+        if current and size + n > max_tokens:
+            chunks.append("".join(current)); current, size = [], 0
+        current.append(unit); size += n
+        if zlib.crc32(unit.encode()) % max_tokens < 2 * n:
+            chunks.append("".join(current)); current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return [c.strip() for c in chunks] or [""]
+
+
+def _chat(prompt: str) -> str:
+    resp = _openai().chat.completions.create(
+        model=_MODEL,
+        messages=[
+            {"role":"system","content":_SYSTEM_PROMPT},
+            {"role":"user","content":prompt},
+        ],
+        temperature=0.2,
+    )
+    return resp.choices[0].message.content.strip()
+
+
+def _cached_chat(prompt: str, gate: Optional[ContextManager] = None) -> str:
+    # chunk summaries are keyed by content hash, so re-runs only pay for changed chunks;
+    # only calls that miss the cache go through the caller's gate
+    def call() -> str:
+        with gate or nullcontext():
+            return _chat(prompt)
+
+    return llm_cache.cached("openai", _MODEL, prompt, {"system": _SYSTEM_PROMPT, "temperature": 0.2}, call)
+
+
+def _map_reduce_summary(text: str, gate: Optional[ContextManager] = None) -> str:
+    chunks = split_tokens(text)
+    if len(chunks) == 1:
+        return _cached_chat(f"Summarize in 5-7 bullet points:\n\n{text}", gate)
+
+    # map: summarize chunks in parallel (bounded; a caller's gate caps the calls across documents)
+    with ThreadPoolExecutor(max_workers=max(1, min(SUMMARY_CONCURRENCY, len(chunks)))) as pool:
+        partials = list(pool.map(
+            lambda c: _cached_chat(f"Summarize this section of a longer document in 3-5 bullet points:\n\n{c}", gate),
+            chunks,
+        ))
+    # reduce: merge SUMMARY_FAN_IN partials at a time until one summary is left
+    while len(partials) > 1:
+        groups = ["\n\n".join(partials[i:i + SUMMARY_FAN_IN]) for i in range(0, len(partials), SUMMARY_FAN_IN)]
+        prompt = "Merge these partial summaries of one document into {} bullet points, dropping repeats:\n\n{}"
+        if len(groups) == 1:
+            return _cached_chat(prompt.format("5-7", groups[0]), gate)
+        with ThreadPoolExecutor(max_workers=max(1, min(SUMMARY_CONCURRENCY, len(groups)))) as pool:
+            partials = list(pool.map(lambda g: _cached_chat(prompt.format("3-5", g), gate), groups))
+    return partials[0]
+
+
+def summarize(text: str, analysis: Optional[TextAnalysis] = None, gate: Optional[ContextManager] = None) -> str:
+    """LLM map-reduce summary (every LLM call enters `gate`, if given); extractive without OpenAI."""
+    if _openai():
         try:
-            resp = _OPENAI.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role":"system","content":"You concisely summarize text for busy analysts."},
-                    {"role":"user","content":f"Summarize in 5-7 bullet points:\n\n{text[:12000]}"},
-                ],
-                temperature=0.2,
-            )
-            return resp.choices[0].message.content.strip()
+            return _map_reduce_summary(text, gate)
         except Exception:
             pass
+    if analysis is not None:
+        return analysis.summary
     return simple_extractive_summary(text, max_sentences=6)
 
 def extract_topics(text: str, k: int = 5) -> List[str]:
     # very small heuristic topic extractor
-    words = re.findall(r"\b[a-zA-Z]{4,}\b", text.lower())
-    stop = set("with this that from into about were have which their there would shall could should might your just when will them they been being because other every those where while whose meanwhile among after before above below".split())
-    freq = {}
-    for w in words:
-        if w in stop: continue
-        freq[w] = freq.get(w, 0) + 1
-    topics = [w for w,_ in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:k]]
-    return topics
+    return analyze_text(text, k=k).topics
 
 def simple_sentiment(text: str) -> str:
-    pos = len(re.findall(r"\b(good|great|gain|up|positive|success|improve|beat)\b", text.lower()))
-    neg = len(re.findall(r"\b(bad|fall|down|loss|negative|miss|risk|issue|decline)\b", text.lower()))
-    if abs(pos-neg) <= 1: return "neutral"
-    return "positive" if pos > neg else "negative"
+    return analyze_text(text).sentiment
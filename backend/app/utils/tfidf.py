@@ -0,0 +1,158 @@
+import logging, os, tempfile, threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy.orm import Session
+from ..config import TFIDF_STATE_PATH
+from .text import content_terms
+from .watermark import Watermark
+
+log = logging.getLogger(__name__)
+
+
+class CorpusStats:
+    """
+    Document frequencies over the `documents` table, kept incrementally.
+
+    Terms map to column ids in `vocab`; `df[i]` is the number of documents
+    containing term i. `mark` records which document ids are folded in, so
+    `sync` only has to read rows committed since.
+    """
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.df = np.zeros(1024, dtype=np.int64)
+        self.n_docs = 0
+        self.mark = Watermark()
+        self.lock = threading.Lock()
+
+    def _ids(self, terms) -> np.ndarray:
+        ids = []
+        for t in terms:
+            i = self.vocab.get(t)
+            if i is None:
+                i = self.vocab[t] = len(self.vocab)
+            ids.append(i)
+        if len(self.vocab) > len(self.df):
+            self.df = np.concatenate([self.df, np.zeros(max(len(self.df), len(self.vocab) - len(self.df)), dtype=np.int64)])
+        return np.asarray(ids, dtype=np.int64)
+
+    def add(self, texts: Sequence[str]) -> None:
+        for text in texts:
+            ids = self._ids(set(content_terms(text)))
+            self.df[ids] += 1
+            self.n_docs += 1
+
+    def sync(self, db: Session, batch: int = 1000) -> int:
+        """Fold documents not seen yet into the stats; returns how many were added."""
+        from ..models import Document
+        added = 0
+        while True:
+            rows = self.mark.fetch(db, Document.content, batch=batch)
+            if not rows:
+                return added
+            self.add([content for _, content in rows])
+            self.mark.advance([id_ for id_, _ in rows])
+            added += len(rows)
+
+    def idf(self) -> np.ndarray:
+        df = self.df[:len(self.vocab)]
+        return (np.log((1 + self.n_docs) / (1 + df)) + 1).astype(np.float32)
+
+    def save(self, path: str) -> None:
+        """Write a snapshot to `path` atomically; each writer stages its own temp file, so concurrent processes can't clash."""
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp.npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    terms=np.array(list(self.vocab), dtype=object),
+                    df=self.df[:len(self.vocab)],
+                    meta=np.array([self.n_docs, self.mark.last_id], dtype=np.int64),
+                    gap_ids=np.array(list(self.mark.gaps), dtype=np.int64),
+                    gap_seen=np.array(list(self.mark.gaps.values()), dtype=np.float64),
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "CorpusStats":
+        data = np.load(path, allow_pickle=True)
+        stats = cls()
+        stats.vocab = {t: i for i, t in enumerate(data["terms"].tolist())}
+        stats.df = np.concatenate([data["df"], np.zeros(1024, dtype=np.int64)])
+        n_docs, last_id = (int(x) for x in data["meta"])
+        gaps = dict(zip(data["gap_ids"].tolist(), data["gap_seen"].tolist())) if "gap_ids" in data else {}
+        stats.n_docs, stats.mark = n_docs, Watermark(last_id, gaps)
+        return stats
+
+
+def top_terms(stats: CorpusStats, texts: Sequence[str], k: int = 5) -> List[List[str]]:
+    """
+    TF-IDF top-k terms for each text, scored in one sparse pass over the batch.
+    Terms unseen by the corpus get the maximum idf.
+    """
+    from scipy import sparse
+    rows, cols, counts = [], [], []
+    for r, text in enumerate(texts):
+        tf = Counter(content_terms(text))
+        if not tf:
+            continue
+        rows.extend([r] * len(tf))
+        cols.extend(stats._ids(tf.keys()))
+        counts.extend(tf.values())
+    if not rows:
+        return [[] for _ in texts]
+
+    tf = sparse.csr_matrix(
+        (np.log1p(np.asarray(counts, dtype=np.float32)), (np.asarray(rows), np.asarray(cols))),
+        shape=(len(texts), len(stats.vocab)),
+    )
+    scores = tf.multiply(stats.idf()[np.newaxis, :]).tocsr()
+    scores.sort_indices()
+
+    # rank inside each row without a python loop: sort by (row, -score)
+    row_of = np.repeat(np.arange(scores.shape[0]), np.diff(scores.indptr))
+    order = np.lexsort((-scores.data, row_of))
+    rank = np.arange(len(order)) - scores.indptr[row_of[order]]
+    keep = order[rank < k]
+
+    terms = np.array(list(stats.vocab), dtype=object)
+    out: List[List[str]] = [[] for _ in texts]
+    for r, term in zip(row_of[keep], terms[scores.indices[keep]]):
+        out[r].append(term)
+    return out
+
+
+_STATS: Optional[CorpusStats] = None
+_STATS_LOCK = threading.Lock()
+
+
+def corpus_topics(texts: Sequence[str], k: int = 5) -> List[List[str]]:
+    """
+    Bring the shared corpus stats up to date, then score `texts` against it.
+    The catch-up reads through its own session, so only committed documents
+    are counted, never the caller's still-open (possibly rolled back) batch.
+    """
+    from ..db import SessionLocal
+    global _STATS
+    with _STATS_LOCK:
+        if _STATS is None:
+            if TFIDF_STATE_PATH and os.path.exists(TFIDF_STATE_PATH):
+                try:
+                    _STATS = CorpusStats.load(TFIDF_STATE_PATH)
+                except Exception as e:
+                    log.warning(f"could not load tf-idf state, rebuilding: {e}")
+            _STATS = _STATS or CorpusStats()
+        stats = _STATS
+    with stats.lock, SessionLocal() as db:
+        if stats.sync(db) and TFIDF_STATE_PATH:
+            try:
+                stats.save(TFIDF_STATE_PATH)
+            except Exception as e:
+                # the in-memory stats are still good; the next sync tries again
+                log.warning(f"could not save tf-idf state: {e}")
+        return top_terms(stats, texts, k=k)
@@ -0,0 +1,53 @@
+import time
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from ..config import WATERMARK_GAP_WINDOW, WATERMARK_GAP_TTL
+
+
+class Watermark:
+    """
+    Which document ids a derived structure (tf-idf stats, vector index) has
+    folded in: every id up to `last_id` except those in `gaps`.
+
+    Ids are handed out before commit, so a reader can see id 12 committed
+    while 11 is still in flight (or about to roll back). Missing ids just
+    below the newest one seen are kept in `gaps` and looked up again on
+    every sync; a gap still missing after WATERMARK_GAP_TTL seconds is taken
+    to be rolled back (or deleted) and forgotten.
+    """
+
+    def __init__(self, last_id: int = 0, gaps: Optional[Dict[int, float]] = None):
+        self.last_id = last_id
+        self.gaps: Dict[int, float] = dict(gaps or {})
+
+    def fetch(self, db: Session, *columns, batch: int = 1000) -> List:
+        """The next `batch` unseen rows as (id, *columns), in id order. Call `advance` once they are folded in."""
+        from ..models import Document
+        cond = Document.id > self.last_id
+        if self.gaps:
+            cond = or_(cond, Document.id.in_(list(self.gaps)))
+        return db.execute(select(Document.id, *columns).where(cond).order_by(Document.id).limit(batch)).all()
+
+    def advance(self, ids: Sequence[int]) -> None:
+        now = time.time()
+        for i in ids:
+            self.gaps.pop(i, None)
+        top = max(ids, default=self.last_id)
+        if top > self.last_id:
+            seen = set(ids)
+            for i in range(max(self.last_id + 1, top - WATERMARK_GAP_WINDOW), top):
+                if i not in seen:
+                    self.gaps.setdefault(i, now)
+            self.last_id = top
+        self.gaps = {i: t for i, t in self.gaps.items() if now - t < WATERMARK_GAP_TTL}
+
+    def covers(self, doc_id: int) -> bool:
+        return doc_id <= self.last_id and doc_id not in self.gaps
+
+    def to_dict(self) -> Dict:
+        return {"last_id": self.last_id, "gaps": [[i, t] for i, t in self.gaps.items()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Watermark":
+        return cls(int(data.get("last_id", 0)), {int(i): float(t) for i, t in data.get("gaps", [])})
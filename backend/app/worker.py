@@ -1,15 +1,13 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from .db import get_db
 from .models import Task
 from .schemas import InsightOut
 from .deps import get_current_user_id
 from dotenv import load_dotenv
 import os, datetime, logging
 import httpx
-import logging
-import yfinance as yf
+from .connectors.http_client import get_client
+from .connectors.gemini import gemini_chat_async
 
 # ----------------- SETUP -----------------
 router = APIRouter(prefix="/worker", tags=["worker"])
@@ -17,8 +15,6 @@ load_dotenv()
 
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-pro-latest:generateContent"
 
 logging.basicConfig(level=logging.INFO)
 
@@ -27,33 +23,21 @@ logging.basicConfig(level=logging.INFO)
 async def fetch_news(query="AI", language="en", page_size=5):
     url = f"https://newsapi.org/v2/everything?q={query}&language={language}&sortBy=publishedAt&pageSize={page_size}&apiKey={NEWS_API_KEY}"
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            res = await client.get(url)
-            res.raise_for_status()
-            return res.json().get("articles", [])
+        res = await get_client().get(url, timeout=10)
+        res.raise_for_status()
+        return res.json().get("articles", [])
     except httpx.RequestError as e:
         logging.error(f"News API request failed: {e}")
         raise HTTPException(status_code=503, detail="News API request failed")
 
 
 async def analyze_with_gemini(text: str):
-    headers = {"Content-Type": "application/json"}
-    params = {"key": GEMINI_API_KEY}
-    body = {
-        "contents": [{"parts": [{"text": f"Summarize this news into key insights:\n{text}"}]}]
-    }
-    try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            res = await client.post(GEMINI_URL, headers=headers, params=params, json=body)
-            res.raise_for_status()
-            data = res.json()
-            try:
-                return data["candidates"][0]["content"]["parts"][0]["text"]
-            except Exception:
-                return "AI summary unavailable."
-    except httpx.RequestError as e:
-        logging.error(f"Gemini API request failed: {e}")
+    # public NewsAPI articles only, so batching them across users shares no tenant data
+    result = await gemini_chat_async(f"Summarize this news into key insights:\n{text}", batch_group="news")
+    if "error" in result:
+        logging.error(f"Gemini API request failed: {result['error']}")
         return "AI summary unavailable."
+    return result["text"]
 
 async def get_stock_data(symbol: str = "RELIANCE.NS", interval: str = "1d", range_: str = "1y"):
     YAHOO_API_KEY = os.getenv("YAHOO_API_KEY")
@@ -72,10 +56,9 @@ async def get_stock_data(symbol: str = "RELIANCE.NS", interval: str = "1d", rang
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            res = await client.get(url, headers=headers, params=params)
-            res.raise_for_status()
-            data = res.json()
+        res = await get_client().get(url, headers=headers, params=params, timeout=10)
+        res.raise_for_status()
+        data = res.json()
 
         timestamps = data["chart"]["result"][0]["timestamp"]
         indicators = data["chart"]["result"][0]["indicators"]["quote"][0]
@@ -112,7 +95,6 @@ async def run_worker(
     symbol: str = Query("RELIANCE.NS", description="Stock symbol (Yahoo Finance)"),
     period: str = Query("6mo", description="Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 5y, max)"),
     interval: str = Query("1d", description="Data interval (1m, 5m, 15m, 1d, 1wk, 1mo)"),
-    db: Session = Depends(get_db),
     user_id: int = Depends(get_current_user_id),  # <-- ensures token is valid
 ):
     """
@@ -0,0 +1,90 @@
+"""Helpers shared by the benchmark scripts: throwaway databases, servers and a load generator."""
+import asyncio, logging, os, statistics, subprocess, sys, tempfile, threading, time
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scratch_db(name: str) -> str:
+    """DATABASE_URL for the run: $DATABASE_URL if set (e.g. a Postgres to measure on), else a fresh SQLite file."""
+    if os.getenv("DATABASE_URL"):
+        return os.environ["DATABASE_URL"]
+    path = os.path.join(tempfile.gettempdir(), f"bench_{name}.db")
+    if os.path.exists(path):
+        os.remove(path)
+    return f"sqlite:///{path}"
+
+
+def create_schema() -> None:
+    from app.db import Base, engine
+    import app.models  # noqa: F401  (register tables)
+    Base.metadata.create_all(bind=engine)
+
+
+def quiet() -> None:
+    """Keep the app's INFO logging and urllib3 pool warnings out of the results."""
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+
+
+def serve_in_thread(app: Any, port: int):
+    """Run an ASGI app with uvicorn on a daemon thread; returns the server (set .should_exit to stop)."""
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def spawn_api(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start `uvicorn app.main:app` as its own process with `env` on top of ours; waits until it answers.
+    Its output goes to bench_api_<port>.log in the temp dir."""
+    log = os.path.join(tempfile.gettempdir(), f"bench_api_{port}.log")
+    with open(log, "w") as out:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT, "LLM_CACHE_PATH": "", **env},
+            stdout=out, stderr=subprocess.STDOUT,
+        )
+    for _ in range(300):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"API did not start, see {log}")
+
+
+async def hammer(client: httpx.AsyncClient, requests: List[Tuple[str, str, Optional[dict]]],
+                 concurrency: int) -> Dict[str, Any]:
+    """Send (method, path, json) requests with at most `concurrency` in flight; returns rate, codes and latencies."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    codes: Dict[int, int] = {}
+
+    async def one(method: str, path: str, body: Optional[dict]) -> None:
+        async with sem:
+            start = time.perf_counter()
+            res = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            codes[res.status_code] = codes.get(res.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(*r) for r in requests))
+    wall = time.perf_counter() - start
+    return {"wall": wall, "rps": len(requests) / wall, "codes": codes, **percentiles(latencies)}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if len(samples) < 2:
+        return {"p50_ms": 1000 * (samples[0] if samples else 0.0), "p99_ms": 1000 * (samples[0] if samples else 0.0)}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50_ms": 1000 * statistics.median(samples), "p99_ms": 1000 * q[98]}
+
+
+def report(label: str, result: Dict[str, Any]) -> None:
+    extra = f" codes={result['codes']}" if "codes" in result else ""
+    print(f"{label:<28} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms{extra}")
@@ -0,0 +1,75 @@
+"""Authenticated requests per second for /me and /worker/run, without and with the auth caches (user-024).
+
+Each side runs the real app in its own uvicorn process. "before" sets JWT_CACHE_SIZE=0
+and USER_CACHE_SIZE=0, so every request verifies the JWT and /me reads the users table.
+"after" uses the defaults. /worker/run?kind=news answers 400 right after auth, so it
+measures the auth dependency alone. Per-call costs of the two dependencies are printed first.
+
+    cd backend && python -m bench.auth_rps --requests 3000 --concurrency 32
+"""
+import argparse, asyncio, os, time
+from bench._common import create_schema, hammer, quiet, report, scratch_db, spawn_api
+
+os.environ["DATABASE_URL"] = scratch_db("auth_rps")
+
+import httpx  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+from app.models import User  # noqa: E402
+from app import deps  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+PORT = 8914
+SIDES = (("before", {"JWT_CACHE_SIZE": "0", "USER_CACHE_SIZE": "0"}), ("after", {}))
+
+
+def per_call(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / n
+
+
+def micro(token: str, user_id: int) -> None:
+    print(f"token verify   {per_call(lambda: deps._verify(token), 5000):7.1f} us  "
+          f"cached {per_call(lambda: deps.get_current_user_id(token), 5000):5.1f} us")
+    print(f"user lookup    {per_call(lambda: (deps.invalidate_user(user_id), deps.get_current_user(user_id)), 1000):7.1f} us  "
+          f"cached {per_call(lambda: deps.get_current_user(user_id), 5000):5.1f} us")
+
+
+async def run(token: str, args) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", headers=headers, timeout=60,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        for method, path in (("GET", "/me"), ("POST", "/worker/run?kind=news")):
+            await client.request(method, path)  # fill the caches, if any
+            report(f"  {path.split('?')[0]}", await hammer(client, [(method, path, None)] * args.requests, args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    quiet()
+    create_schema()
+    with SessionLocal() as db:
+        user = User(name="bench", email="bench@example.com", password_hash="x")
+        db.add(user); db.commit()
+        token = create_access_token(str(user.id), {"email": user.email, "role": "user"})
+        user_id = user.id
+    micro(token, user_id)
+
+    print(f"{args.requests} requests per route, {args.concurrency} in flight")
+    for label, env in SIDES:
+        print(f"{label}: {' '.join(f'{k}={v}' for k, v in env.items()) or 'default caches'}")
+        proc = spawn_api(PORT, env)
+        try:
+            asyncio.run(run(token, args))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
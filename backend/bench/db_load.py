@@ -0,0 +1,66 @@
+"""Load test: sync Session (threadpool) vs AsyncSession routes under concurrency (user-022).
+
+Two bench-only routes run the same per-user count over --rows seeded documents.
+One uses get_db in a plain `def` route, the other uses get_async_db in an `async def` route.
+Both go through the engines and pool settings in app.db (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...).
+
+    cd backend && python -m bench.db_load --requests 2000 --concurrency 64
+    DATABASE_URL=postgresql+psycopg://... python -m bench.db_load
+"""
+import argparse, asyncio, os
+from bench._common import create_schema, hammer, quiet, report, scratch_db, serve_in_thread
+
+os.environ["DATABASE_URL"] = scratch_db("db_load")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+from app.db import engine, get_async_db, get_db  # noqa: E402
+from app.models import Document  # noqa: E402
+
+PORT = 8913
+COUNT = select(func.count()).select_from(Document).where(Document.user_id == 7)
+
+
+def bench_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(db=Depends(get_db)):
+        return db.execute(COUNT).scalar()
+
+    @app.get("/async")
+    async def async_route(db=Depends(get_async_db)):
+        return (await db.execute(COUNT)).scalar()
+
+    return app
+
+
+async def run(args) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=60,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        for path in ("/sync", "/async") * args.rounds:
+            await client.get(path)  # open the pool before timing
+            report(f"{path} session", await hammer(client, [("GET", path, None)] * args.requests, args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=20_000, help="documents to seed")
+    parser.add_argument("--rounds", type=int, default=2, help="alternate sync/async this many times")
+    args = parser.parse_args()
+
+    quiet()
+    create_schema()
+    with engine.begin() as conn:
+        conn.execute(insert(Document), [{"user_id": i % 100, "source": "news", "content": "x"} for i in range(args.rows)])
+    serve_in_thread(bench_app(), PORT)
+    print(f"{args.requests} requests, {args.concurrency} in flight, {engine.url.get_backend_name()} "
+          f"pool_size={engine.pool.size()}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Query benchmark for the hot-path indexes on a seeded dataset (user-020).
+
+Seeds --rows documents and --rows tasks (0.1% of them still queued), then times
+the documents feed page (feed_router._page) and the job claim (jobs._claim_stmt)
+with ix_documents_user_created / ix_tasks_active, and again after dropping them.
+The indexes are recreated before exiting.
+
+    cd backend && python -m bench.feed_queries --rows 1000000
+    DATABASE_URL=postgresql+psycopg2://... python -m bench.feed_queries --rows 1000000
+"""
+import argparse, os, random, time
+from datetime import datetime, timedelta, timezone
+from bench._common import create_schema, quiet, scratch_db
+
+os.environ["DATABASE_URL"] = scratch_db("feed_queries")
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm import load_only  # noqa: E402
+from app.db import SessionLocal, engine  # noqa: E402
+from app.models import Document, Task  # noqa: E402
+from app.feed_router import _page  # noqa: E402
+from app import jobs  # noqa: E402
+
+INDEXES = {"ix_documents_user_created": Document, "ix_tasks_active": Task}
+USERS = 1000
+CHUNK = 20_000
+
+
+def seed(rows: int) -> None:
+    rng = random.Random(20)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        for lo in range(0, rows, CHUNK):
+            n = min(CHUNK, rows - lo)
+            conn.execute(insert(Document), [
+                {"user_id": rng.randint(1, USERS), "source": rng.choice(("news", "url", "upload")), "title": "t",
+                 "content": "x", "created_at": start + timedelta(seconds=lo + i)} for i in range(n)])
+            conn.execute(insert(Task), [
+                {"user_id": rng.randint(1, USERS), "kind": "news", "status": "queued" if rng.random() < 0.001 else "done",
+                 "run_after": start + timedelta(seconds=lo + i), "created_at": start} for i in range(n)])
+
+
+def feed(db, user_id: int) -> None:
+    stmt = (select(Document).options(load_only(Document.id, Document.title, Document.created_at))
+            .where(Document.user_id == user_id))
+    _page(db, Document, stmt, 20, None)
+
+
+def claim(db, user_id: int) -> None:
+    db.execute(jobs._claim_stmt(jobs._now())).scalars().first()
+    db.rollback()
+
+
+def timings(repeat: int):
+    out = {}
+    rng = random.Random(1)
+    with SessionLocal() as db:
+        for name, query in (("documents feed page", feed), ("job claim", claim)):
+            query(db, 1)  # warm the cache
+            start = time.perf_counter()
+            for _ in range(repeat):
+                query(db, rng.randint(1, USERS))
+            out[name] = (time.perf_counter() - start) * 1000 / repeat
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    quiet()
+    create_schema()
+    start = time.perf_counter()
+    seed(args.rows)
+    print(f"seeded {args.rows} documents + {args.rows} tasks in {time.perf_counter() - start:.0f}s "
+          f"on {engine.url.get_backend_name()}")
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE documents; ANALYZE tasks")
+        else:
+            conn.exec_driver_sql("ANALYZE")
+
+    indexes = [i for name, model in INDEXES.items() for i in model.__table__.indexes if i.name == name]
+    with_ix = timings(args.repeat)
+    for ix in indexes:
+        ix.drop(bind=engine)
+    without_ix = timings(args.repeat)
+    for ix in indexes:
+        ix.create(bind=engine)
+
+    for name in with_ix:
+        print(f"{name:<22} {without_ix[name]:9.2f} ms without index  {with_ix[name]:7.2f} ms with")
+
+
+if __name__ == "__main__":
+    main()
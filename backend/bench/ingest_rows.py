@@ -0,0 +1,78 @@
+"""Rows/s for a task's documents + insights (user-010).
+
+The batched path (orchestrator._ingest, then one commit) is compared with
+the old per-article path, which did add/commit/refresh for every Document
+and again for every Insight. The analysis is stubbed, so only persistence is timed.
+
+    cd backend && python -m bench.ingest_rows --articles 500 --tasks 5
+    DATABASE_URL=postgresql+psycopg2://... python -m bench.ingest_rows
+"""
+import argparse, os, time
+from bench._common import create_schema, quiet, scratch_db
+
+os.environ["DATABASE_URL"] = scratch_db("ingest_rows")
+
+from sqlalchemy import event  # noqa: E402
+from app.db import SessionLocal, engine  # noqa: E402
+from app.models import Document, Insight  # noqa: E402
+from app.agent import orchestrator  # noqa: E402
+
+ANALYSIS = {"summary": "stub summary", "topics": ["chips", "ai"], "sentiment": "neutral"}
+commits = 0
+
+
+@event.listens_for(engine, "commit")
+def _count(conn):
+    global commits
+    commits += 1
+
+
+def _payloads(run: str, n: int):
+    # distinct text per article, so near-duplicate detection does not fold them together
+    return [{"source": "news", "title": f"{run} {i}", "url": f"https://news.example/{run}/{i}",
+             "content": f"{run} article {i} " + " ".join(f"w{(i * 7919 + j) % 5003}" for j in range(120)),
+             "meta": {"source": "bench"}} for i in range(n)]
+
+
+def per_row(db, payloads) -> None:
+    """The old path: two commits and two refreshes per article."""
+    for p in payloads:
+        doc = Document(user_id=None, source=p["source"], title=p["title"], url=p["url"],
+                       content=p["content"], meta=p["meta"])
+        db.add(doc); db.commit(); db.refresh(doc)
+        ins = Insight(user_id=None, document_id=doc.id, **ANALYSIS)
+        db.add(ins); db.commit(); db.refresh(ins)
+
+
+def batched(db, payloads) -> None:
+    orchestrator._ingest(db, None, payloads, concurrency=4, rate=1000)
+    db.commit()
+
+
+def main() -> None:
+    global commits
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=500, help="articles per task")
+    parser.add_argument("--tasks", type=int, default=5)
+    args = parser.parse_args()
+
+    quiet()
+    create_schema()
+    orchestrator._analyze_many = lambda contents, concurrency, rate: [dict(ANALYSIS) for _ in contents]
+    orchestrator.corpus_topics = lambda texts, k=5: [[] for _ in texts]
+
+    print(f"{args.tasks} tasks x {args.articles} articles on {engine.url.get_backend_name()}")
+    for label, store in (("per-article commits", per_row), ("one flush per task", batched)):
+        commits, elapsed = 0, 0.0
+        for t in range(args.tasks):
+            payloads = _payloads(f"{store.__name__}{time.time_ns()}{t}", args.articles)
+            with SessionLocal() as db:
+                start = time.perf_counter()
+                store(db, payloads)
+                elapsed += time.perf_counter() - start
+        rows = 2 * args.tasks * args.articles
+        print(f"{label:<22} {rows / elapsed:9.0f} rows/s  {commits / args.tasks:6.0f} commits/task")
+
+
+if __name__ == "__main__":
+    main()
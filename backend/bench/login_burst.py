@@ -0,0 +1,74 @@
+"""Login throughput under a burst, and what it does to other routes (user-025).
+
+Starts the real app in a uvicorn process, registers one user, fires --logins
+concurrent POST /auth/login requests and meanwhile polls a cheap sync route
+(/api/llm/cache) as a canary for threadpool starvation. Reports successful logins/s, the
+latency of each outcome (200, or 503 "busy" shed by the hash queue) and the canary's latency.
+Settings such as BCRYPT_ROUNDS, BCRYPT_WORKERS and BCRYPT_QUEUE come from the environment.
+
+    cd backend && python -m bench.login_burst --logins 200
+    BCRYPT_ROUNDS=10 BCRYPT_WORKERS=4 python -m bench.login_burst
+"""
+import argparse, asyncio, time
+from bench._common import percentiles, scratch_db, spawn_api
+
+import httpx
+
+PORT = 8915
+CANARY = "/api/llm/cache"
+USER = {"name": "bench", "email": "bench@example.com", "password": "bench-password"}
+
+
+async def run(args) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=120) as client:
+        res = await client.post("/auth/register", json=USER)
+        res.raise_for_status()
+        login = {"email": USER["email"], "password": USER["password"]}
+
+        canary, outcomes, done = [], {}, False
+
+        async def poll() -> None:
+            while not done:
+                start = time.perf_counter()
+                await client.get(CANARY)
+                canary.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+
+        async def one() -> None:
+            start = time.perf_counter()
+            res = await client.post("/auth/login", json=login)
+            detail = "" if res.status_code == 200 else res.json().get("detail", "")
+            outcomes.setdefault((res.status_code, detail), []).append(time.perf_counter() - start)
+
+        poller = asyncio.create_task(poll())
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(args.logins)))
+        wall = time.perf_counter() - start
+        done = True
+        await poller
+
+    ok = len(outcomes.get((200, ""), []))
+    print(f"{args.logins} logins in {wall:.1f}s: {ok / wall:.2f} ok/s")
+    for (code, detail), samples in sorted(outcomes.items()):
+        p = percentiles(samples)
+        print(f"  {code} {detail[:30]:<30} n={len(samples):<5} p50 {p['p50_ms']:7.0f} ms  max {max(samples) * 1000:7.0f} ms")
+    p = percentiles(canary)
+    print(f"  canary {CANARY} n={len(canary)} p50 {p['p50_ms']:.0f} ms  p99 {p['p99_ms']:.0f} ms  "
+          f"max {max(canary) * 1000:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    proc = spawn_api(PORT, {"DATABASE_URL": scratch_db("login_burst"), "DB_CREATE_ALL": "true"})
+    try:
+        asyncio.run(run(args))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Microbenchmark: single-pass text analysis vs the three old helpers on 20 KB documents (user-012).
+
+The "before" side is a frozen copy of simple_extractive_summary, extract_topics and
+simple_sentiment as they were before analyze_text. The orchestrator called all
+three on every document.
+
+    cd backend && python -m bench.text_analysis --docs 200 --size 20000
+"""
+import argparse, random, re, time
+from app.utils.text import analyze_batch, analyze_text
+
+_WORD = r"\b[a-zA-Z]{4,}\b"
+
+
+def old_summary(text: str, max_sentences: int = 5) -> str:
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    if len(sentences) <= max_sentences:
+        return text.strip()
+    words = re.findall(_WORD, text.lower())
+    freq = {}
+    for w in words: freq[w] = freq.get(w, 0) + 1
+    score = []
+    for s in sentences:
+        sw = re.findall(_WORD, s.lower())
+        sc = sum(freq.get(w, 0) for w in sw) / (len(sw) + 1e-6)
+        score.append((sc, s))
+    return " ".join(s for _, s in sorted(score, key=lambda x: x[0], reverse=True)[:max_sentences])
+
+
+def old_topics(text: str, k: int = 5):
+    words = re.findall(_WORD, text.lower())
+    stop = set("with this that from into about were have which their there would shall could should might your just when will them they been being because other every those where while whose meanwhile among after before above below".split())
+    freq = {}
+    for w in words:
+        if w in stop: continue
+        freq[w] = freq.get(w, 0) + 1
+    return [w for w, _ in sorted(freq.items(), key=lambda x: x[1], reverse=True)[:k]]
+
+
+def old_sentiment(text: str) -> str:
+    pos = len(re.findall(r"\b(good|great|gain|up|positive|success|improve|beat)\b", text.lower()))
+    neg = len(re.findall(r"\b(bad|fall|down|loss|negative|miss|risk|issue|decline)\b", text.lower()))
+    if abs(pos - neg) <= 1: return "neutral"
+    return "positive" if pos > neg else "negative"
+
+
+def documents(n: int, size: int, seed: int = 7):
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(3000)] + "good gain loss risk market chips with from their".split()
+    docs = []
+    for _ in range(n):
+        parts, length = [], 0
+        while length < size:
+            sentence = " ".join(rng.choice(vocab) for _ in range(rng.randint(8, 25))).capitalize() + rng.choice(".!?")
+            parts.append(sentence)
+            length += len(sentence) + 1
+        docs.append(" ".join(parts)[:size])
+    return docs
+
+
+def timed(label: str, fn, docs) -> float:
+    start = time.perf_counter()
+    fn(docs)
+    per_doc = (time.perf_counter() - start) * 1000 / len(docs)
+    print(f"{label:<32} {per_doc:7.2f} ms/doc")
+    return per_doc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--size", type=int, default=20_000, help="characters per document")
+    args = parser.parse_args()
+
+    docs = documents(args.docs, args.size)
+    for d in docs[:20]:
+        a = analyze_text(d, k=5, max_sentences=6)
+        assert (a.topics, a.sentiment) == (old_topics(d), old_sentiment(d))
+        assert a.summary == old_summary(d, max_sentences=6)
+
+    print(f"{args.docs} documents of {args.size} chars")
+    before = timed("old: summary + topics + sentiment",
+                   lambda ds: [(old_summary(d, 6), old_topics(d), old_sentiment(d)) for d in ds], docs)
+    after = timed("analyze_text", lambda ds: [analyze_text(d, k=5, max_sentences=6) for d in ds], docs)
+    timed("analyze_batch", lambda ds: analyze_batch(ds, k=5, max_sentences=6), docs)
+    print(f"speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
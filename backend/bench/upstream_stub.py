@@ -0,0 +1,74 @@
+"""Stub-server throughput for the async connectors (user-005).
+
+A local stub answers AlphaVantage after --delay seconds. /api/stock/{symbol} (async
+connector) is compared with a sync baseline route that calls fetch_stock on the
+threadpool, as every route did before. Each request uses a new symbol, so the cache never
+hits. The stub is on 127.0.0.1, so the async client uses its general pool (HTTP_MAX_CONNECTIONS),
+not the per-upstream cap.
+
+    cd backend && python -m bench.upstream_stub --requests 200 --concurrency 100 --delay 2
+"""
+import argparse, asyncio, os, time
+from bench._common import quiet, scratch_db, serve_in_thread, hammer, report
+
+os.environ["DATABASE_URL"] = scratch_db("upstream_stub")
+os.environ["ALPHA_VANTAGE_KEY"] = "bench"
+os.environ["DB_CREATE_ALL"] = "true"
+
+import httpx  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+STUB_PORT, API_PORT = 8911, 8912
+
+
+def stub_app(delay: float) -> Starlette:
+    series = {f"2026-10-{d:02d}": {"1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": str(d), "5. volume": "10"}
+              for d in range(1, 9)}
+
+    async def query(request):
+        await asyncio.sleep(delay)
+        return JSONResponse({"Meta Data": {}, "Time Series (Daily)": series})
+
+    return Starlette(routes=[Route("/query", query)])
+
+
+def api_app():
+    from app.connectors import alphavantage
+    from app.main import app
+    alphavantage.ALPHA_VANTAGE_URL = f"http://127.0.0.1:{STUB_PORT}/query"
+
+    @app.get("/bench/stock-sync/{symbol}")
+    def stock_sync(symbol: str):
+        return alphavantage.fetch_stock(symbol)
+
+    return app
+
+
+async def run(args) -> None:
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{API_PORT}", timeout=120,
+                                 limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        for label, prefix in (("sync route (threadpool)", "/bench/stock-sync"), ("async route", "/api/stock")):
+            tag = f"{label[:4]}{time.time_ns()}"
+            reqs = [("GET", f"{prefix}/{tag}{i}", None) for i in range(args.requests)]
+            report(label, await hammer(client, reqs, args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=2.0, help="stub latency in seconds")
+    args = parser.parse_args()
+
+    api = api_app()
+    quiet()
+    serve_in_thread(stub_app(args.delay), STUB_PORT)
+    serve_in_thread(api, API_PORT)
+    print(f"{args.requests} requests, {args.concurrency} in flight, upstream delay {args.delay}s")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
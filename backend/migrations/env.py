@@ -1,7 +1,10 @@
 from logging.config import fileConfig
 
+import os
+
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from app.db import DATABASE_URL, _url
 from app.models import Base
 from alembic import context
 
@@ -9,6 +12,10 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 
+# the app's DATABASE_URL (same driver pinning as app.db) wins over alembic.ini
+if os.getenv("DATABASE_URL"):
+    config.set_main_option("sqlalchemy.url", _url(DATABASE_URL).render_as_string(hide_password=False).replace("%", "%%"))
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -0,0 +1,46 @@
+"""trend rollups
+
+Revision ID: 4b9d2c7e1f30
+Revises: e6730d76d067
+Create Date: 2026-10-18 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9d2c7e1f30'
+down_revision: Union[str, None] = 'e6730d76d067'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trend_articles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('query', sa.String(length=255), nullable=False),
+    sa.Column('url_hash', sa.String(length=40), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('published_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('query', 'url_hash', name='uq_trend_articles_query_url')
+    )
+    op.create_index('ix_trend_articles_query_published', 'trend_articles', ['query', 'published_at'], unique=False)
+    op.create_table('trend_buckets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('query', sa.String(length=255), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('query', 'day', name='uq_trend_buckets_query_day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('trend_buckets')
+    op.drop_index('ix_trend_articles_query_published', table_name='trend_articles')
+    op.drop_table('trend_articles')
@@ -0,0 +1,38 @@
+"""task queue columns
+
+Revision ID: 9a3f6e21c4d8
+Revises: 4b9d2c7e1f30
+Create Date: 2026-10-18 11:02:37.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3f6e21c4d8'
+down_revision: Union[str, None] = '4b9d2c7e1f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('max_attempts', sa.Integer(), server_default='3', nullable=False))
+    op.add_column('tasks', sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('tasks', sa.Column('locked_by', sa.String(length=64), nullable=True))
+    op.add_column('tasks', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('last_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('tasks', 'last_error')
+    op.drop_column('tasks', 'heartbeat_at')
+    op.drop_column('tasks', 'lease_expires_at')
+    op.drop_column('tasks', 'locked_by')
+    op.drop_column('tasks', 'run_after')
+    op.drop_column('tasks', 'max_attempts')
+    op.drop_column('tasks', 'attempts')
@@ -0,0 +1,32 @@
+"""scope document url dedupe to the owner
+
+Revision ID: a84e1c6f3d92
+Revises: f3a9c2d71b54
+Create Date: 2026-10-19 10:04:51.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a84e1c6f3d92'
+down_revision: Union[str, None] = 'f3a9c2d71b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL owners (shared news) compare equal through coalesce, so they stay deduplicated too
+    op.create_index('ux_documents_owner_url_hash', 'documents', [sa.text('coalesce(user_id, 0)'), 'url_hash'], unique=True)
+    op.create_index('ix_documents_url_hash', 'documents', ['url_hash'], unique=False)
+    op.drop_index('ux_documents_url_hash', table_name='documents')
+
+
+def downgrade() -> None:
+    # only possible while no two owners hold the same url
+    op.create_index('ux_documents_url_hash', 'documents', ['url_hash'], unique=True)
+    op.drop_index('ix_documents_url_hash', table_name='documents')
+    op.drop_index('ux_documents_owner_url_hash', table_name='documents')
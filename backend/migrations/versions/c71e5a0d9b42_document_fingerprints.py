@@ -0,0 +1,110 @@
+"""document url hash and simhash
+
+Revision ID: c71e5a0d9b42
+Revises: 9a3f6e21c4d8
+Create Date: 2026-10-18 15:40:12.518327
+
+"""
+import hashlib, re
+from collections import Counter
+from typing import Optional, Sequence, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e5a0d9b42'
+down_revision: Union[str, None] = '9a3f6e21c4d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copies of app.dedupe.url_hash / simhash as of this revision, so later
+# changes to the app's fingerprints cannot change what this migration writes.
+_TOKEN = re.compile(r"\w+")
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|cmpid|ocid)$", re.IGNORECASE)
+_BITS = np.arange(64, dtype=np.uint64)
+_OFFSET = 1 << 63
+
+
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "http").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if scheme in ("http", "https") else scheme, host, path, query, ""))
+
+
+def url_hash(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    return hashlib.sha256(_normalize_url(url).encode()).hexdigest()
+
+
+def simhash(text: str, shingle: int = 3) -> Optional[int]:
+    words = _TOKEN.findall(text.lower())
+    grams = Counter(" ".join(words[i:i + shingle]) for i in range(max(1, len(words) - shingle + 1)))
+    grams.pop("", None)
+    if not grams:
+        return None
+    digests = b"".join(hashlib.blake2b(g.encode(), digest_size=8).digest() for g in grams)
+    hashes = np.frombuffer(digests, dtype=np.uint64)
+    weights = np.fromiter(grams.values(), dtype=np.int64, count=len(grams))
+    bits = ((hashes[:, None] >> _BITS) & np.uint64(1)).astype(np.int64)
+    votes = (bits * 2 - 1).T @ weights
+    value = int(np.sum(np.left_shift(np.uint64(1), _BITS[votes > 0]), dtype=np.uint64))
+    return value - _OFFSET
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('url_hash', sa.String(length=64), nullable=True))
+    op.add_column('documents', sa.Column('simhash', sa.BigInteger(), nullable=True))
+
+    # backfill; only the oldest copy of a url keeps its hash so the unique index can be built
+    bind = op.get_bind()
+    documents = sa.table(
+        'documents',
+        sa.column('id', sa.Integer), sa.column('title', sa.String), sa.column('url', sa.String),
+        sa.column('content', sa.Text), sa.column('url_hash', sa.String), sa.column('simhash', sa.BigInteger),
+    )
+    seen = set()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(documents.c.id, documents.c.title, documents.c.url, documents.c.content)
+            .where(documents.c.id > last_id).order_by(documents.c.id).limit(1000)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for id_, title, url, content in rows:
+            h = url_hash(url)
+            if h in seen:
+                h = None
+            elif h:
+                seen.add(h)
+            updates.append({'_id': id_, 'url_hash': h, 'simhash': simhash(f"{title or ''} {content}")})
+        bind.execute(
+            documents.update().where(documents.c.id == sa.bindparam('_id'))
+            .values(url_hash=sa.bindparam('url_hash'), simhash=sa.bindparam('simhash')),
+            updates,
+        )
+        last_id = rows[-1][0]
+
+    op.create_index('ux_documents_url_hash', 'documents', ['url_hash'], unique=True)
+    op.create_index('ix_documents_simhash', 'documents', ['simhash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_simhash', table_name='documents')
+    op.drop_index('ux_documents_url_hash', table_name='documents')
+    op.drop_column('documents', 'simhash')
+    op.drop_column('documents', 'url_hash')
@@ -0,0 +1,41 @@
+"""indexes for per-user feeds and the task poller
+
+Revision ID: d2b8f4a61e07
+Revises: c71e5a0d9b42
+Create Date: 2026-10-18 16:21:48.330915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8f4a61e07'
+down_revision: Union[str, None] = 'c71e5a0d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so a large production table stays writable while the index builds
+    with op.get_context().autocommit_block():
+        op.create_index('ix_documents_user_created', 'documents', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], postgresql_concurrently=True)
+        op.create_index('ix_documents_source_created', 'documents', ['source', sa.text('created_at DESC')], postgresql_concurrently=True)
+        op.create_index('ix_insights_document_id', 'insights', ['document_id'], postgresql_concurrently=True)
+        op.create_index('ix_insights_user_created', 'insights', ['user_id', sa.text('created_at DESC'), sa.text('id DESC')], postgresql_concurrently=True)
+        op.create_index('ix_tasks_user_created', 'tasks', ['user_id', sa.text('created_at DESC')], postgresql_concurrently=True)
+        op.create_index('ix_tasks_active', 'tasks', ['status', 'run_after'], postgresql_where=ACTIVE, sqlite_where=ACTIVE, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_active', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_created', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_insights_user_created', table_name='insights', postgresql_concurrently=True)
+        op.drop_index('ix_insights_document_id', table_name='insights', postgresql_concurrently=True)
+        op.drop_index('ix_documents_source_created', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('ix_documents_user_created', table_name='documents', postgresql_concurrently=True)
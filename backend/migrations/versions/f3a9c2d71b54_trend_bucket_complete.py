@@ -0,0 +1,28 @@
+"""trend buckets hold NewsAPI day totals; flag final ones
+
+Revision ID: f3a9c2d71b54
+Revises: d2b8f4a61e07
+Create Date: 2026-10-19 09:12:37.104512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d71b54'
+down_revision: Union[str, None] = 'd2b8f4a61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing buckets were counted from capped article pages; leaving them
+    # incomplete makes the next refresh replace them with NewsAPI's totals
+    op.add_column('trend_buckets', sa.Column('complete', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('trend_buckets', 'complete')